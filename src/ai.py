@@ -1,66 +1,60 @@
 # Contains the AI class for computer-controlled snakes.
-from ursina import Entity, Vec3, color, distance, destroy
+# Game logic only: the cube entities live in views.AISnakeView.
 import random
 import time
 import config
-from config import AI_COLOR, AI_SPEED
+from config import AI_SPEED
+from vec import Vec3, distance
+import world
+
+# The six axis moves, built once
+POSSIBLE_MOVES = (
+    Vec3(1,0,0), Vec3(-1,0,0), 
+    Vec3(0,1,0), Vec3(0,-1,0), 
+    Vec3(0,0,1), Vec3(0,0,-1)
+)
 
 class AISnake:
     def __init__(self, start_pos=(5, 0, 5), aggressive_mode=False):
+        start_pos = Vec3(*start_pos)
         self.body = [
-            Entity(model='cube', color=AI_COLOR, scale=1, position=start_pos, collider=None),
-            Entity(model='cube', color=AI_COLOR, scale=1, position=(start_pos[0], start_pos[1]-1, start_pos[2]), collider=None),
-            Entity(model='cube', color=AI_COLOR, scale=1, position=(start_pos[0], start_pos[1]-2, start_pos[2]), collider=None)
+            start_pos,
+            start_pos - Vec3(0, 1, 0),
+            start_pos - Vec3(0, 2, 0)
         ]
-        self.head = self.body[0]
+        self.view = None # Set by views.AISnakeView
         self.direction = Vec3(0, 1, 0)
         self.last_move_time = time.time()
         self.speed = AI_SPEED
         self.alive = True
         self.aggressive_mode = aggressive_mode
         self.hunt_radius = 6
-        self.update_appearance()
-
-    def update_appearance(self):
-        num_segments = len(self.body)
-        if num_segments <= 1:
-            self.head.color = AI_COLOR
-            return
 
-        for i, segment in enumerate(self.body):
-            alpha = 1.0 - (i / (num_segments - 1)) * 0.8
-            segment.color = color.Color(AI_COLOR.r, AI_COLOR.g, AI_COLOR.b, alpha)
+    @property
+    def head(self):
+        return self.body[0]
 
     def get_valid_moves(self, player_snake, grid_size):
         """
         Returns a list of vectors (directions) that won't kill the AI.
         """
-        possible_moves = [
-            Vec3(1,0,0), Vec3(-1,0,0), 
-            Vec3(0,1,0), Vec3(0,-1,0), 
-            Vec3(0,0,1), Vec3(0,0,-1)
-        ]
-        
         safe_moves = []
-        half_grid = grid_size // 2
 
-        for move in possible_moves:
+        for move in POSSIBLE_MOVES:
             # Don't reverse direction instantly
             if move == -self.direction:
                 continue
 
-            next_pos = self.head.position + move
+            next_pos = self.head + move
             
             # 1. Check Wall Collision
-            if (next_pos.x > half_grid or next_pos.x < -half_grid or 
-                next_pos.y > half_grid or next_pos.y < -half_grid or 
-                next_pos.z > half_grid or next_pos.z < -half_grid):
+            if world.is_outside(next_pos, grid_size):
                 continue
             
             # 2. Check Self Collision
             hit_self = False
             for segment in self.body:
-                if next_pos == segment.position:
+                if next_pos == segment:
                     hit_self = True
                     break
             if hit_self: continue
@@ -68,7 +62,7 @@ class AISnake:
             # 3. Check Player Collision (Don't run into the player)
             hit_player = False
             for segment in player_snake.body:
-                if next_pos == segment.position:
+                if next_pos == segment:
                     hit_player = True
                     break
             if hit_player: continue
@@ -81,10 +75,14 @@ class AISnake:
         if not self.alive: return
 
         # Only move if enough time passed
-        if time.time() - self.last_move_time < 1 / self.speed:
+        now = time.time()
+        interval = 1 / self.speed
+        if now - self.last_move_time < interval:
             return
 
-        self.last_move_time = time.time()
+        # Same tick timing as the player (see update_game in main.py)
+        self.last_move_time += interval
+        if now - self.last_move_time > interval: self.last_move_time = now
 
         # Get all moves that won't kill us immediately
         safe_moves = self.get_valid_moves(player_snake, config.GRID_SIZE)
@@ -96,8 +94,8 @@ class AISnake:
         # --- DYNAMIC STRATEGY SELECTION ---
         
         # 1. Calculate Distances
-        dist_to_player = distance(self.head.position, player_snake.head.position)
-        dist_to_food = distance(self.head.position, food.position)
+        dist_to_player = distance(self.head, player_snake.head)
+        dist_to_food = distance(self.head, food.position)
         
         # 2. Calculate Priorities
         # Food Priority: Base urgency + proximity bonus
@@ -132,7 +130,7 @@ class AISnake:
             prediction_steps = max(1, min(6, int(dist_to_player / 1.5)))
             
             # Project player's future position
-            intercept_point = player_snake.head.position + player_snake.direction * prediction_steps
+            intercept_point = player_snake.head + player_snake.direction * prediction_steps
             target_pos = intercept_point
             
         # ---------------------------
@@ -146,12 +144,12 @@ class AISnake:
         random.shuffle(safe_moves) 
 
         for move in safe_moves:
-            next_pos = self.head.position + move
+            next_pos = self.head + move
             dist_to_target = distance(next_pos, target_pos)
             
             # Tie-breaker: If hunting, try to stay close to the center to avoid getting trapped in corners
             if mode == "HUNT":
-                dist_to_center = distance(next_pos, Vec3(0,0,0))
+                dist_to_center = distance(next_pos, (0,0,0))
                 dist_to_target += dist_to_center * 0.1 # Slight bias towards center
 
             if dist_to_target < min_dist:
@@ -163,31 +161,20 @@ class AISnake:
 
     def move(self):
         # Calculate new head position
-        new_head_position = self.head.position + self.direction
-        
-        # Get the last segment (tail)
-        segment_to_move = self.body.pop()
-        
-        # Update its position to the new head position
-        segment_to_move.position = new_head_position
+        new_head_position = self.head + self.direction
         
-        # Insert it at the beginning of the body list, making it the new head
-        self.body.insert(0, segment_to_move)
-        
-        # Update head reference
-        self.head = self.body[0]
+        # Drop the tail and insert the new head at the beginning of the body list
+        self.body.pop()
+        self.body.insert(0, new_head_position)
 
-        # Visual: Make AI look where it's going
-        self.head.look_at(self.head.position + self.direction)
-        
-        # Re-apply appearance to update colors/transparency for the new order
-        self.update_appearance()
+        # Visual: the view re-orders its cubes and makes the head look where it's going
+        if self.view: self.view.on_move()
 
     def grow(self):
-        new_segment = Entity(model='cube', color=AI_COLOR, scale=1, position=self.body[-1].position, collider=None)
-        self.body.append(new_segment)
-        self.update_appearance()
+        self.body.append(self.body[-1])
+        if self.view: self.view.on_grow()
     
     def reset(self):
-        for segment in self.body:
-            destroy(segment)
\ No newline at end of file
+        if self.view:
+            self.view.destroy()
+            self.view = None
@@ -1,27 +1,34 @@
 """
 Camera logic for following the snake in 3D space
 Now supports multiple camera modes (Orbital, TopDown, Follow).
+Only the current mode is updated, by the 'camera' scheduler system.
 """
 
 import math
 from ursina import *
 import config
+import scheduler
+
+def view_size():
+    """Grid size the camera distances are based on (huge grids are not seen whole)."""
+    return min(config.GRID_SIZE, config.MAX_GRID_SIZE)
 
 # --- 1. Base Class ---
-class CameraMode(Entity):
-    def __init__(self, snake, **kwargs):
-        super().__init__(**kwargs)
-        self.snake = snake
+class CameraMode:
+    def __init__(self, snake):
         self.active = False
-        
+        self.set_snake(snake)
+        camera.orthographic = False
+
+    def set_snake(self, snake):
+        """Follow another snake (a new game reuses the same camera modes)."""
+        self.snake = snake
         if self.snake:
-            self.last_valid_direction = self.snake.direction.normalized()
-            self.last_valid_up = self.snake.up.normalized()
+            self.last_valid_direction = Vec3(*self.snake.direction).normalized()
+            self.last_valid_up = Vec3(*self.snake.up).normalized()
         else:
             self.last_valid_direction = Vec3(0, 0, 1)
             self.last_valid_up = Vec3(0, 1, 0)
-            
-        camera.orthographic = False
 
     def enable(self):
         self.active = True
@@ -32,12 +39,23 @@ class CameraMode(Entity):
     def disable(self):
         self.active = False
 
+    def smoothing(self):
+        """Share of the way to its target the camera moves per second (0: no lerp)."""
+        return 0
+
     def _update_valid_vectors(self):
         if not self.snake: return
         if self.snake.direction.length() > 0.01:
-            self.last_valid_direction = self.snake.direction.normalized()
+            self.last_valid_direction = Vec3(*self.snake.direction).normalized()
         if self.snake.up.length() > 0.01:
-            self.last_valid_up = self.snake.up.normalized()
+            self.last_valid_up = Vec3(*self.snake.up).normalized()
+
+    def _head_position(self):
+        # Where the head is drawn (between two cells, see interpolation.py)
+        view = self.snake.view
+        if view: return view.drawn_head
+        # The snake logic stores plain grid tuples
+        return Vec3(*self.snake.head)
 
     def update(self):
         if self.active:
@@ -51,16 +69,22 @@ class OrbitalCameraMode(CameraMode):
     Rotates around the center of the grid.
     Paired with: Standard Input.
     """
-    def __init__(self, snake, grid_center=Vec3(0,0,0), **kwargs):
-        super().__init__(snake, **kwargs)
+    def __init__(self, snake, grid_center=Vec3(0,0,0)):
+        super().__init__(snake)
         self.center = grid_center 
-        self.radius = config.GRID_SIZE * 2.5
-        self.height = config.GRID_SIZE * 1.25
         self.smooth = 5.0  
+
+    def set_snake(self, snake):
+        super().set_snake(snake)
+        self.radius = view_size() * 2.5
+        self.height = view_size() * 1.25
         self._current_az = -math.pi / 2
+
+    def smoothing(self):
+        return self.smooth
         
     def _azimuth_from_head(self):
-        rel = self.snake.head.position - self.center
+        rel = self._head_position() - self.center
         dist_sq = rel.x**2 + rel.z**2
         if dist_sq < 0.1: return self._current_az
         target_az = math.atan2(rel.z, rel.x)
@@ -71,8 +95,8 @@ class OrbitalCameraMode(CameraMode):
         az = self._azimuth_from_head()
         cam_x = self.center.x + self.radius * math.cos(az)
         cam_z = self.center.z + self.radius * math.sin(az)
-        cam_y = self.snake.head.position.y + self.height 
-        return Vec3(cam_x, cam_y, cam_z), self.snake.head.position
+        cam_y = self._head_position().y + self.height 
+        return Vec3(cam_x, cam_y, cam_z), self._head_position()
 
     def enable(self):
         super().enable()
@@ -99,21 +123,27 @@ class TopDownCameraMode(CameraMode):
     - Default: Rotates around the center of the grid, tracking the snake's angle.
     - Press 'L': Toggles LOCK mode. When locked, the camera freezes completely.
     """
-    def __init__(self, snake, grid_center=Vec3(0,0,0), **kwargs):
-        super().__init__(snake, **kwargs)
+    def __init__(self, snake, grid_center=Vec3(0,0,0)):
+        super().__init__(snake)
         self.center = grid_center 
-        self.radius = config.GRID_SIZE * 2.5
-        self.height = config.GRID_SIZE * 1.25
         self.smooth = 5.0  
+        self._l_pressed = False
+
+    def set_snake(self, snake):
+        super().set_snake(snake)
+        self.radius = view_size() * 2.5
+        self.height = view_size() * 1.25
         self._current_az = -math.pi / 2
         
         # 鎖定狀態控制
         self.locked = False
-        self._l_pressed = False
+
+    def smoothing(self):
+        return self.smooth
         
     def _azimuth_from_head(self):
         # 計算相對於中心的角度
-        rel = self.snake.head.position - self.center
+        rel = self._head_position() - self.center
         dist_sq = rel.x**2 + rel.z**2
         if dist_sq < 0.1: return self._current_az
         target_az = math.atan2(rel.z, rel.x)
@@ -124,8 +154,8 @@ class TopDownCameraMode(CameraMode):
         az = self._azimuth_from_head()
         cam_x = self.center.x + self.radius * math.cos(az)
         cam_z = self.center.z + self.radius * math.sin(az)
-        cam_y = self.snake.head.position.y + self.height 
-        return Vec3(cam_x, cam_y, cam_z), self.snake.head.position
+        cam_y = self._head_position().y + self.height 
+        return Vec3(cam_x, cam_y, cam_z), self._head_position()
 
     def enable(self):
         super().enable()
@@ -167,13 +197,19 @@ class FollowCameraMode(CameraMode):
     Your original camera logic.
     Paired with: Free Roam Input.
     """
-    def __init__(self, snake, **kwargs):
-        super().__init__(snake, **kwargs)
+    def __init__(self, snake):
+        super().__init__(snake)
         self.smooth_speed = 4
-        self.distance = config.GRID_SIZE * 1.75
         self.height = 5
         self.offset_side = 3
 
+    def set_snake(self, snake):
+        super().set_snake(snake)
+        self.distance = view_size() * 1.75
+
+    def smoothing(self):
+        return self.smooth_speed
+
     def enable(self):
         super().enable()
         camera.fov = 90
@@ -191,7 +227,7 @@ class FollowCameraMode(CameraMode):
         up = self.last_valid_up
         right = direction.cross(up).normalized()
 
-        base_pos = self.snake.head.position - (direction * self.distance) + (up * self.height)
+        base_pos = self._head_position() - (direction * self.distance) + (up * self.height)
         
         target_left = base_pos - (right * self.offset_side)
         target_right = base_pos + (right * self.offset_side)
@@ -202,14 +238,17 @@ class FollowCameraMode(CameraMode):
         target_pos = target_left if dist_left < dist_right else target_right
 
         camera.position = lerp(camera.position, target_pos, speed)
-        camera.lookAt(self.snake.head.position, up)
+        camera.lookAt(self._head_position(), up)
 
 
 # --- 3. Manager ---
 
-class SnakeCamera(Entity):
+class SnakeCamera:
+    """
+    Created once; every game (and menu preview) just calls set_snake() and
+    set_mode() instead of building new camera modes.
+    """
     def __init__(self, snake, grid_center=Vec3(0,0,0)):
-        super().__init__()
         self.snake = snake
         
         self.modes = {
@@ -224,6 +263,14 @@ class SnakeCamera(Entity):
             mode.disable()
             
         self.set_mode(self.current_mode_name)
+        scheduler.add('camera', self.update, scheduler.CAMERA, active=snake is not None)
+
+    def set_snake(self, snake):
+        self.snake = snake
+        for mode in self.modes.values():
+            mode.set_snake(snake)
+        # Nothing to follow between games
+        scheduler.set_active('camera', snake is not None)
 
     def set_mode(self, name):
         if name in self.modes:
@@ -233,5 +280,8 @@ class SnakeCamera(Entity):
             self.current_mode_name = name
             self.modes[name].enable()
 
-    def input(self, key):
-        pass
+    def smoothing(self):
+        return self.modes[self.current_mode_name].smoothing()
+
+    def update(self):
+        self.modes[self.current_mode_name].update()
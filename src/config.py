@@ -1,15 +1,25 @@
 """
 Game configuration settings.
+Plain data only (no engine import). Colors are hex strings or ursina color
+names, turned into engine colors by palette.py.
 """
 
-from ursina import color
-
 # Screen settings
 FULLSCREEN = False
 
 # Game settings
 GRID_SIZE = 8
 MAX_GRID_SIZE = 12
+# Grids above MAX_GRID_SIZE (the huge mode) are stored and drawn in chunks
+HUGE_GRID_SIZE = 256
+CHUNK_SIZE = 16
+CHUNK_VIEW_DISTANCE = 1  # Chunks drawn around the camera's chunk (per axis)
+CHUNKS_PER_FRAME = 1     # Chunk meshes built per frame while moving
+# Culling: the grid and obstacles are drawn in chunks of GRID_CHUNK_SIZE cells,
+# chunks further than CULL_DISTANCE from the camera are hidden
+GRID_CHUNK_SIZE = 4
+CULL_DISTANCE = 32
+GRID_ALPHA_CUTOFF = 0.3  # Grid joints more transparent than this are not drawn
 SNAKE_SPEED = 3
 #Model
 SNAKE_BODY_MODEL = 'snkb'
@@ -19,14 +29,44 @@ SNAKE_FOOD_MODEL = 'apple'
 SNAKE_BODY_SCALE = 0.4
 SNAKE_HEAD_SCALE = 0.7
 FOOD_SCALE = 0.5
+# Level of detail: the models get simplified copies (python src/lod.py build)
+# drawn from these camera distances (world units) on
+LOD_DISTANCES = (20, 40)
+LOD_RATIOS = (0.5, 0.25) # Share of the vertices kept by each simplified level
 # Colors
-BACKGROUND_COLOR = color.hex("#FFFFFF")
-SNAKE_COLOR = color.hex('#1644a1')
-SNAKE_HEAD_COLOR = color.hex('#4c7ae8')
-FOOD_COLOR = color.hex('#EA4335')
-OBSTACLE_COLOR = color.gray
-GRID_COLOR = color.hex('#93C46C')
-BOUNDARY_COLOR = color.hex("#5C5C5C")
+BACKGROUND_COLOR = "#FFFFFF"
+SNAKE_COLOR = '#1644a1'
+SNAKE_HEAD_COLOR = '#4c7ae8'
+FOOD_COLOR = '#EA4335'
+OBSTACLE_COLOR = 'gray'
+GRID_COLOR = '#93C46C'
+BOUNDARY_COLOR = "#5C5C5C"
 
-AI_COLOR = color.orange
+AI_COLOR = 'orange'
+# Number of precomputed colors in the snake body gradients
+GRADIENT_STEPS = 32
+# Draw each snake body as one instanced mesh when the GPU supports it
+INSTANCED_SEGMENTS = True
 AI_SPEED = 2  # Make it slightly slower than player so it's fair
+
+# Frame pacing (see governor.py), 0 means uncapped
+MENU_FPS = 30   # Menu, previews and the game-over screen
+IDLE_FPS = 5    # Window not in the foreground
+# While playing: enough frames per snake move, and enough for the camera's
+# smoothing to move at most CAMERA_MAX_STEP of the way per frame
+FRAMES_PER_TICK = 8
+CAMERA_MAX_STEP = 0.1
+MAX_FPS = 120
+
+# Leaderboard storage: 'json' (highscores.json), 'sqlite' (full game history)
+# 'log' (append-only log, safe with several game processes)
+# or 'server' (leaderboard_server.py shared by several cabinets)
+LEADERBOARD_BACKEND = 'json'
+LEADERBOARD_DB = 'highscores.db'
+LEADERBOARD_LOG = 'highscores.log'
+LEADERBOARD_SERVER = ('127.0.0.1', 8765)
+LEADERBOARD_SPOOL = 'highscores.spool' # Results the server hasn't acknowledged at exit
+
+# Per-game stats (see telemetry.py)
+TELEMETRY_ENABLED = True
+TELEMETRY_FOLDER = 'telemetry'
@@ -0,0 +1,88 @@
+"""
+Distance culling and rendered node counts.
+
+Panda3D already skips nodes whose bounds are outside the camera frustum, but
+only nodes small enough to leave the frustum benefit, so the grid and the
+obstacles are built in chunks (see views.py). A CullGroup adds distance
+culling on top: chunks further than `distance` from the camera are hidden.
+Groups are shared by name, see get_group(). stats() reports how many nodes
+of each group are actually drawn.
+
+Node bounds are read as world coordinates, which holds for the grid and
+obstacle chunks (their parents sit at the origin).
+"""
+
+from ursina import application, camera
+import scheduler
+
+_groups = {}
+
+
+class CullGroup:
+    def __init__(self, name, distance=None):
+        self.name = name
+        self.distance = distance # None: frustum culling only
+        self.nodes = []
+        self.eye = None # Camera position of the last distance check
+        _groups[name] = self
+        _start()
+
+    def add(self, node):
+        self.nodes.append(node)
+        self.eye = None
+
+    def remove(self, node):
+        self.nodes.remove(node)
+        node.show()
+
+    def refresh(self):
+        """Re-checks distances on the next frame (after a node's geometry changed)."""
+        self.eye = None
+
+    def update(self, eye):
+        # Only worth it once the camera moved a bit
+        if self.distance is None: return
+        if self.eye is not None and (eye - self.eye).length() < 1: return
+        self.eye = eye
+        for node in self.nodes:
+            bounds = node.getBounds()
+            if bounds.isEmpty() or bounds.isInfinite(): continue
+            far = (bounds.getCenter() - eye).length() - bounds.getRadius() > self.distance
+            if far != node.isHidden():
+                if far: node.hide()
+                else: node.show()
+
+    def count(self):
+        """(drawn, shown, total): in view, not culled or disabled, all nodes."""
+        cam = application.base.cam
+        frustum = cam.node().getLens().makeBounds()
+        shown = [node for node in self.nodes if not node.isHidden() and node.getStashedAncestor().isEmpty()]
+        drawn = 0
+        for node in shown:
+            bounds = node.getBounds().makeCopy()
+            bounds.xform(node.getMat(cam))
+            if frustum.contains(bounds): drawn += 1
+        return drawn, len(shown), len(self.nodes)
+
+
+def get_group(name, distance=None):
+    """The cull group `name`, created on first use."""
+    if name not in _groups:
+        CullGroup(name, distance)
+    return _groups[name]
+
+
+def _start():
+    if not scheduler.is_active('culling'):
+        scheduler.add('culling', _cull, scheduler.CULLING)
+
+
+def _cull():
+    eye = camera.world_position
+    for group in _groups.values():
+        group.update(eye)
+
+
+def stats():
+    """{group name: (drawn, shown, total)} for every cull group."""
+    return {name: group.count() for name, group in _groups.items()}
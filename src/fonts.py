@@ -0,0 +1,128 @@
+"""
+Pre-rasterized font atlases.
+
+Every ursina Text clears and re-rasterizes its DynamicTextFont when it is
+created, which stalls the menu while it builds its texts. Instead, the
+printable ASCII range of each UI font is rendered once with panda3d's
+egg-mkfont into a texture atlas, cached on disk per font and pixel size,
+and registered in the font pool under the original font path.
+"""
+
+import builtins
+import shutil
+import subprocess
+from pathlib import Path
+
+from panda3d.core import FontPool, StaticTextFont, Filename
+from ursina import application, Text
+
+CACHE_FOLDER = 'font_cache'
+ATLAS_CHARS = '32-126' # Printable ASCII
+ATLAS_PPU = int(Text.default_resolution)
+
+def cache_folder():
+    return Path(application.asset_folder) / CACHE_FOLDER
+
+
+def atlas_path(font_path, ppu=ATLAS_PPU):
+    return cache_folder() / f'{Path(font_path).stem}_{ppu}.bam'
+
+
+def resolve_font_file(font_path):
+    """
+    Font paths in ui.py are relative to src/ (e.g. '../assets/x.otf'),
+    ursina's default font lives in its internal fonts folder.
+    """
+    for folder in (Path(application.asset_folder) / 'src', Path(application.asset_folder), application.internal_fonts_folder):
+        candidate = (folder / font_path).resolve()
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def build_atlas(font_path, ppu=ATLAS_PPU):
+    """
+    Rasterizes the font into an atlas .bam with egg-mkfont + egg2bam.
+    Returns the atlas path, or None if the tools or the font are missing.
+    """
+    source = resolve_font_file(font_path)
+    egg_mkfont = shutil.which('egg-mkfont')
+    egg2bam = shutil.which('egg2bam')
+    if not source or not egg_mkfont or not egg2bam:
+        return None
+
+    target = atlas_path(font_path, ppu)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    egg = target.with_suffix('.egg')
+    page_pattern = str(target.with_suffix('')) + '_%i'
+    try:
+        subprocess.run([egg_mkfont, '-o', str(egg), '-chars', ATLAS_CHARS, '-ppu', str(ppu),
+                        '-pp', page_pattern, str(source)], check=True, capture_output=True)
+        # -rawtex stores the page images inside the .bam
+        subprocess.run([egg2bam, '-rawtex', '-o', str(target), str(egg)], check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Warning: Could not build font atlas for {font_path}: {e}")
+        return None
+    finally:
+        egg.unlink(missing_ok=True)
+        for page in target.parent.glob(f'{target.stem}_*.png'):
+            page.unlink(missing_ok=True)
+    return target
+
+
+def preload(font_paths, ppu=ATLAS_PPU):
+    """
+    Loads (building on first run) the atlas of each font and registers it in
+    the font pool, so loader.loadFont(font_path) returns the atlas.
+    Fonts without an atlas keep using the dynamic font.
+    """
+    install_text_support()
+    for font_path in font_paths:
+        target = atlas_path(font_path, ppu)
+        if not target.exists() and build_atlas(font_path, ppu) is None:
+            builtins.loader.loadFont(font_path)
+            continue
+
+        font = builtins.loader.loadFont(Filename.fromOsSpecific(str(target)).getFullpath())
+        if font and font.isValid():
+            FontPool.addFont(font_path, font)
+
+
+_installed = False
+
+def install_text_support():
+    """
+    ursina's Text assumes a DynamicTextFont: it calls clear() and
+    setPixelsPerUnit() on its font. Atlas fonts are already rasterized, so
+    those calls are skipped for them.
+    """
+    global _installed
+    if _installed: return
+    _installed = True
+
+    dynamic_font_setter = Text.font.fset
+    dynamic_resolution_getter = Text.resolution.fget
+    dynamic_resolution_setter = Text.resolution.fset
+
+    def font_setter(self, value):
+        font = builtins.loader.loadFont(value)
+        if isinstance(font, StaticTextFont):
+            self._font = font
+            self._font.setLineHeight(self.line_height)
+            if self.text:
+                self.text = self.raw_text   # update text
+            return
+        dynamic_font_setter(self, value)
+
+    def resolution_getter(self):
+        if isinstance(self._font, StaticTextFont):
+            return ATLAS_PPU
+        return dynamic_resolution_getter(self)
+
+    def resolution_setter(self, value):
+        if isinstance(self._font, StaticTextFont):
+            return
+        dynamic_resolution_setter(self, value)
+
+    Text.font = property(Text.font.fget, font_setter)
+    Text.resolution = property(resolution_getter, resolution_setter)
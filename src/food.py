@@ -2,48 +2,28 @@
 Food for the snake.
 """
 
-from ursina import Entity
-import random
-import config
-from config import *
+from vec import Vec3
+import world
 
-class Food(Entity):
-    def __init__(self, occupied_positions=None):
+
+class Food:
+    def __init__(self, occupied_positions=None, near=None):
         if occupied_positions is None: occupied_positions = []
-        super().__init__(
-            model=SNAKE_FOOD_MODEL,
-            color=FOOD_COLOR,
-            scale=FOOD_SCALE,
-            position=self.get_valid_position(occupied_positions),
-            collider=None
-        )
+        self.view = None # Set by views.FoodView
+        self.position = self.get_valid_position(occupied_positions, near)
 
     def random_position(self):
-        half_grid = config.GRID_SIZE // 2
-        return (
-            random.randint(-half_grid + 1, half_grid - 1),
-            random.randint(-half_grid + 1, half_grid - 1),
-            random.randint(-half_grid + 1, half_grid - 1)
-        )
+        return world.random_cell()
 
-    def get_valid_position(self, occupied_positions):
+    def get_valid_position(self, occupied_positions, near=None):
         # Try to find a valid position up to 100 times to prevent infinite loops
-        for _ in range(100):
-            pos = self.random_position()
-            # Convert pos tuple to Vec3 logic if needed, or just compare values
-            # Ursina positions are Vec3, occupied_positions likely contains Vec3 or tuples
-            is_occupied = False
-            for occ in occupied_positions:
-                # Compare rounded positions to handle float inaccuracies
-                if round(occ.x) == pos[0] and round(occ.y) == pos[1] and round(occ.z) == pos[2]:
-                    is_occupied = True
-                    break
-            
-            if not is_occupied:
-                return pos
-        
+        # (near: keep it reachable in huge grids, see world.random_cell)
+        pos = world.find_free_cell(occupied_positions, near=near)
+
         # Fallback if grid is super full
-        return self.random_position()
+        if pos is None: pos = self.random_position()
+        return Vec3(*pos)
 
-    def reposition(self, occupied_positions=[]):
-        self.position = self.get_valid_position(occupied_positions)
+    def reposition(self, occupied_positions=[], near=None):
+        self.position = self.get_valid_position(occupied_positions, near)
+        if self.view: self.view.on_reposition()
@@ -0,0 +1,108 @@
+"""
+Frame pacing.
+
+The window runs with vsync off, so without a cap the menu, the previews and
+the game-over screen render as fast as they can and keep a core and the GPU
+busy. The governor caps the frame rate (Panda3D's limited clock mode) by
+state:
+
+    'loading'    uncapped, the stages load one per frame
+    'menu'       MENU_FPS (menu, previews and the game-over screen)
+    'play'       play_rate(): FRAMES_PER_TICK frames per snake move, and
+                 enough for the camera smoothing, up to MAX_FPS
+    unfocused    IDLE_FPS, whatever the state
+
+It also keeps the last frame times (the 'frame pacing' scheduler system),
+see stats().
+"""
+
+from array import array
+from panda3d.core import ClockObject
+import config
+import scheduler
+
+HISTORY = 600 # Frame times kept for stats()
+
+state = 'loading'
+focused = True
+fps = 0
+_smoothing = 0
+_frame_times = array('f', [0.0]) * HISTORY
+_frames = 0
+_started = False
+
+
+def play_rate(smoothing=0):
+    """Frame rate while playing, for a camera moving `smoothing` of the way per second."""
+    rate = max(config.SNAKE_SPEED * config.FRAMES_PER_TICK, smoothing / config.CAMERA_MAX_STEP)
+    return min(rate, config.MAX_FPS) if config.MAX_FPS else rate
+
+
+def set_state(new_state, smoothing=0):
+    """'loading', 'menu', 'game over' or 'play' (with the camera's smoothing)."""
+    global state, _smoothing
+    _start()
+    state = new_state
+    _smoothing = smoothing
+    _apply()
+
+
+def _target():
+    if not focused:
+        return config.IDLE_FPS
+    if state == 'play':
+        return play_rate(_smoothing)
+    if state in ('menu', 'game over'):
+        return config.MENU_FPS
+    return 0
+
+
+def _apply():
+    global fps
+    target = int(round(_target()))
+    if target == fps: return
+    fps = target
+    clock = ClockObject.getGlobalClock()
+    if fps:
+        clock.setMode(ClockObject.MLimited)
+        clock.setFrameRate(fps)
+    else:
+        clock.setMode(ClockObject.MNormal)
+
+
+def _start():
+    global _started
+    if not _started:
+        _started = True
+        scheduler.listen('window-event', _on_window_event)
+        scheduler.add('frame pacing', _record, scheduler.PACING)
+
+
+def _on_window_event(window):
+    global focused
+    properties = window.getProperties()
+    now_focused = properties.getForeground() and not properties.getMinimized()
+    if now_focused != focused:
+        focused = now_focused
+        _apply()
+
+
+def _record():
+    global _frames
+    _frame_times[_frames % HISTORY] = ClockObject.getGlobalClock().getDt()
+    _frames += 1
+
+
+def stats():
+    """
+    {'state', 'fps' (cap, 0 uncapped), 'frames' (measured), 'mean ms',
+    'p50 ms', 'p95 ms', 'p99 ms', 'max ms'} over the last HISTORY frames.
+    """
+    times = sorted(_frame_times[:min(_frames, HISTORY)])
+    result = {'state': state if focused else f'{state} (unfocused)', 'fps': fps, 'frames': len(times)}
+    if times:
+        result['mean ms'] = sum(times) / len(times) * 1000
+        for p in (50, 95, 99):
+            result[f'p{p} ms'] = times[min(len(times) - 1, len(times) * p // 100)] * 1000
+        result['max ms'] = times[-1] * 1000
+    return result
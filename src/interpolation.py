@@ -0,0 +1,85 @@
+"""
+Render interpolation.
+
+The snakes move a whole cell per simulation tick (SNAKE_SPEED or AI_SPEED
+ticks per second). Instead of jumping, their views draw them between the two
+latest simulation states:
+
+- every tick the view publishes the new state into a Snapshots double
+  buffer (previous, current), with the time it arrived,
+- every frame the 'interpolation' scheduler system asks each registered view
+  to draw the blend of the pair at alpha(), from 0 (previous) right after a
+  tick to 1 (current) one tick interval later.
+
+What is drawn trails the simulation by up to one tick. In exchange the tick
+rate no longer limits how smooth the snakes look, and a publish is a single
+reference swap, so the simulation could publish from another thread.
+"""
+
+import time
+import scheduler
+
+_views = []
+_started = False
+
+
+class Snapshots:
+    """The two latest states of a simulated object, as (time, state) pairs."""
+    def __init__(self, state, interval):
+        now = time.perf_counter()
+        self.pair = ((now, state), (now, state)) # (previous, current)
+        self.interval = interval # Seconds between ticks
+
+    def publish(self, state, jump=False):
+        """New current state. jump=True shows it right away (no blend from the previous one)."""
+        now = time.perf_counter()
+        current = (now, state)
+        self.pair = (current if jump else self.pair[1], current)
+
+    @property
+    def previous(self):
+        return self.pair[0][1]
+
+    @property
+    def current(self):
+        return self.pair[1][1]
+
+    def alpha(self, now):
+        """How far to blend from previous to current at `now`, 0..1."""
+        if self.interval <= 0: return 1.0
+        return min(1.0, (now - self.pair[1][0]) / self.interval)
+
+
+def blend_quat(q0, q1, alpha):
+    """Normalized lerp between two rotations (along the shorter way)."""
+    if q0.dot(q1) < 0: q1 = -q1
+    q = q0 * (1 - alpha) + q1 * alpha
+    q.normalize()
+    return q
+
+
+def add(view):
+    """Calls view.interpolate(now) every frame until remove(view)."""
+    _start()
+    _views.append(view)
+    scheduler.set_active('interpolation', True)
+
+
+def remove(view):
+    if view in _views:
+        _views.remove(view)
+    if _started and not _views:
+        scheduler.set_active('interpolation', False)
+
+
+def _start():
+    global _started
+    if not _started:
+        _started = True
+        scheduler.add('interpolation', _run, scheduler.INTERPOLATION, active=False)
+
+
+def _run():
+    now = time.perf_counter()
+    for view in _views:
+        view.interpolate(now)
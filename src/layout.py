@@ -0,0 +1,61 @@
+"""
+Dirty-flag UI layout.
+
+Screens anchored to the window edges register a layout function with add().
+It runs once right away, and after that only when the window's aspect ratio
+changes (the edges move): the 'ui layout' scheduler system is switched on
+for the next frame, lays out every registered screen once and switches
+itself off again. A screen that just sits there costs nothing per frame.
+
+set_text() and set_color() only touch a Text when the value differs, since
+assigning Text.text rebuilds its glyphs even for the same string.
+"""
+
+import scheduler
+
+_layouts = {} # name -> layout function
+_started = False
+
+
+def add(name, func):
+    """Lays out `name` with func() now and after every window resize."""
+    _start()
+    _layouts[name] = func
+    func()
+
+
+def remove(name):
+    _layouts.pop(name, None)
+
+
+def invalidate():
+    """Lays out every registered screen on the next frame."""
+    if _layouts:
+        scheduler.set_active('ui layout', True)
+
+
+def _start():
+    global _started
+    if not _started:
+        _started = True
+        scheduler.listen('aspectRatioChanged', invalidate)
+        scheduler.add('ui layout', _run, scheduler.UI, active=False)
+
+
+def _run():
+    for func in list(_layouts.values()):
+        func()
+    scheduler.set_active('ui layout', False)
+
+
+def set_text(text_entity, value):
+    """Sets the text if it changed. Returns whether it did."""
+    if getattr(text_entity, 'raw_text', None) == value: # Not set before the first text
+        return False
+    text_entity.text = value
+    return True
+
+
+def set_color(entity, value):
+    if entity.color != value:
+        entity.color = value
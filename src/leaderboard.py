@@ -1,17 +1,94 @@
 #score keeping
+import atexit
 import json
 import os
+import threading
+import time
 
 # Define where the file is saved
 SCORE_FILE = "highscores.json"
 
+# Optional storage engine replacing the JSON file (see use_backend()).
+# It must provide load_scores(mode), save_new_score(name, score, mode, **stats),
+# get_player_best(name, mode) and flush().
+_backend = None
+
+def use_backend(backend):
+    """Routes every leaderboard call to `backend`. None goes back to the JSON file."""
+    global _backend
+    flush()
+    _backend = backend
+
+def use_sqlite(db_file, migrate_from=SCORE_FILE):
+    """
+    Switches to the SQLite backend, importing the JSON scores the first time.
+    """
+    from leaderboard_sqlite import SQLiteLeaderboard
+    backend = SQLiteLeaderboard(db_file)
+    if migrate_from and os.path.exists(migrate_from):
+        backend.migrate_from_json(migrate_from)
+    use_backend(backend)
+    return backend
+
+def use_log(log_file='highscores.log'):
+    """
+    Switches to the append-only log backend, for several game processes
+    sharing SCORE_FILE (which becomes the log's compacted snapshot).
+    """
+    from leaderboard_log import LogLeaderboard
+    backend = LogLeaderboard(SCORE_FILE, log_file)
+    use_backend(backend)
+    return backend
+
+def use_server(host, port, spool_file='highscores.spool'):
+    """
+    Switches to a leaderboard_server.py instance shared by several cabinets.
+    Scores are sent in the background and read from a pushed local copy.
+    Scores still unsent at flush() are kept in `spool_file` until the next run.
+    """
+    from leaderboard_client import LeaderboardClient
+    backend = LeaderboardClient(host, port, spool_file=spool_file)
+    use_backend(backend)
+    return backend
+
+# Process-wide cache of the score file.
+# It is re-read only when the file's mtime or size changes, and the file is
+# stat'ed at most once per CHECK_INTERVAL seconds.
+CHECK_INTERVAL = 1.0
+_cache = None
+_cache_stamp = None
+_last_check = 0.0
+
+def _file_stamp():
+    try:
+        st = os.stat(SCORE_FILE)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def invalidate_cache():
+    global _cache
+    _cache = None
+
+# Background writer.
+# save_new_score updates the cache right away and hands the table to a writer
+# thread. Bursts are coalesced: only the newest pending table gets written.
+_write_lock = threading.Condition()
+_pending = None
+_writer = None
+
 def get_empty_structure():
     return {
         'classic': [],
         'ai': []
     }
 
-def load_all_scores():
+def _read_file():
+    """
+    Returns the parsed score file, or None if it exists but can't be read.
+    An unreadable file is copied to SCORE_FILE + '.corrupt' before anything
+    overwrites it.
+    """
     if not os.path.exists(SCORE_FILE):
         return get_empty_structure()
     try:
@@ -24,34 +101,127 @@ def load_all_scores():
                     'ai': get_empty_structure()['ai']
                 }
             return data
-    except:
-        return get_empty_structure()
+    except (OSError, ValueError) as e:
+        print(f"Error reading scores: {e}")
+        try:
+            with open(SCORE_FILE, 'rb') as src, open(SCORE_FILE + '.corrupt', 'wb') as dst:
+                dst.write(src.read())
+        except OSError:
+            pass
+        return None
+
+def _write_atomic(data):
+    # Write next to the real file, then swap it in: readers never see a half-written file
+    tmp_file = SCORE_FILE + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, SCORE_FILE)
+
+def _writer_loop():
+    global _pending, _cache_stamp
+    while True:
+        with _write_lock:
+            while _pending is None:
+                _write_lock.wait()
+            data = _pending
+
+        try:
+            _write_atomic(data)
+        except Exception as e:
+            print(f"Error saving score: {e}")
+
+        with _write_lock:
+            if _pending is data:
+                _pending = None
+                if _cache is data:
+                    _cache_stamp = _file_stamp()
+            _write_lock.notify_all()
+
+def _queue_write(data):
+    global _pending, _writer
+    with _write_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_writer_loop, name='leaderboard-writer', daemon=True)
+            _writer.start()
+        _pending = data
+        _write_lock.notify_all()
+
+def flush(timeout=5.0):
+    """Blocks until queued scores are on disk. Returns False on timeout."""
+    if _backend: return _backend.flush(timeout)
+    deadline = time.monotonic() + timeout
+    with _write_lock:
+        while _pending is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _write_lock.wait(remaining)
+    return True
+
+atexit.register(flush)
+
+def load_all_scores():
+    """
+    Returns the cached score table ({mode: [entries]}).
+    The returned dict is shared, callers must not modify it.
+    """
+    global _cache, _cache_stamp, _last_check
+    now = time.monotonic()
+    # The cache is ahead of the file while a write is pending
+    if _cache is not None and (_pending is not None or now - _last_check < CHECK_INTERVAL):
+        return _cache
+
+    _last_check = now
+    stamp = _file_stamp()
+    if _cache is None or stamp != _cache_stamp:
+        data = _read_file()
+        if data is None:
+            # Keep what we had rather than wiping the table
+            data = _cache if _cache is not None else get_empty_structure()
+        _cache = data
+        _cache_stamp = stamp
+    return _cache
 
 def load_scores(mode='classic'):
     """
     Reads the high scores for a specific mode from the JSON file.
     Returns a list of dictionaries: [{'name': 'Player', 'score': 10}, ...]
     """
+    if _backend: return _backend.load_scores(mode)
     data = load_all_scores()
     return data.get(mode, [])
 
-def save_new_score(name, score, mode='classic'):
+def get_player_best(name, mode='classic'):
+    """Best recorded score of `name` in `mode`, or None."""
+    if _backend: return _backend.get_player_best(name, mode)
+    for entry in load_scores(mode):
+        if entry['name'] == name:
+            return entry['score']
+    return None
+
+def prepare_ranks():
+    """Loads what get_rank needs up front (it can take a moment on big histories)."""
+    if _backend and hasattr(_backend, 'prepare_ranks'):
+        _backend.prepare_ranks()
+
+def get_rank(score, mode='classic'):
     """
-    Updates the score for a player if the new score is higher than their existing record.
-    If the player is new, adds them.
-    Maintains top 10 scores per mode.
-    Ignores 'Guest' players.
+    (rank, top percent) of `score` among every game played in `mode`, e.g.
+    (1204, 8.0). None if the backend keeps no game history.
     """
-    if name == "Guest":
-        return
-
-    data = load_all_scores()
-    
-    # Ensure the mode key exists
-    if mode not in data:
-        data[mode] = []
+    if _backend and hasattr(_backend, 'get_rank'):
+        return _backend.get_rank(score, mode)
+    return None
 
-    scores = data[mode]
+def merge_score(scores, name, score, limit=10):
+    """
+    Folds one result into a top list ([{'name', 'score'}], best first).
+    Returns the new list, or None if it doesn't change anything.
+    Merging the same result twice gives the same list.
+    """
+    scores = [dict(entry) for entry in scores]
     
     # Check if player exists
     player_found = False
@@ -61,8 +231,7 @@ def save_new_score(name, score, mode='classic'):
             if score > entry['score']:
                 entry['score'] = score
             else:
-                # New score is not higher, so we don't update
-                return
+                return None
             break
             
     if not player_found:
@@ -72,14 +241,41 @@ def save_new_score(name, score, mode='classic'):
     scores.sort(key=lambda x: x['score'], reverse=True)
     
     # Keep only top 10
-    scores = scores[:10]
+    scores = scores[:limit]
+    if not any(entry['name'] == name for entry in scores):
+        return None
+    return scores
+
+def save_new_score(name, score, mode='classic', length=None, duration=None):
+    """
+    Updates the score for a player if the new score is higher than their existing record.
+    If the player is new, adds them.
+    Maintains top 10 scores per mode.
+    Ignores 'Guest' players.
+    The file is written in the background (see flush()).
+    length/duration (snake length, seconds played) are only kept by backends
+    that store the game history.
+    """
+    global _cache
+
+    if _backend:
+        _backend.save_new_score(name, score, mode, length=length, duration=duration)
+        return
+
+    if name == "Guest":
+        return
+
+    # Work on a copy so the cache only changes together with the file
+    data = {key: [dict(entry) for entry in entries] for key, entries in load_all_scores().items()}
+    
+    scores = merge_score(data.get(mode, []), name, score)
+    if scores is None:
+        # New score is not higher, so we don't update
+        return
     data[mode] = scores
     
-    try:
-        with open(SCORE_FILE, 'w') as f:
-            json.dump(data, f)
-    except Exception as e:
-        print(f"Error saving score: {e}")
+    _cache = data
+    _queue_write(data)
 
 def is_high_score(score, mode='classic'):
     """
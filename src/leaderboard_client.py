@@ -0,0 +1,175 @@
+"""
+Leaderboard backend talking to leaderboard_server.py.
+
+The network runs on an asyncio loop in a background thread, so the game
+never waits on it:
+- save_new_score queues the result (and shows it locally right away); the
+  queue is sent in batches every BATCH_INTERVAL seconds.
+- load_scores answers from the top lists the server pushes. A mode that was
+  never asked for returns [] until the server has sent it.
+- A lost connection is retried; unacknowledged results are sent again.
+  flush() waits for the acks; what is still unsent when it gives up is
+  written to a spool file, and sent first by the next client that starts.
+  Every result carries an id, and the server skips ids it already stored,
+  so a result whose ack was lost is not recorded twice.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import uuid
+
+import leaderboard
+from leaderboard_server import encode
+
+BATCH_INTERVAL = 0.25
+RECONNECT_DELAY = 2.0
+SPOOL_FILE = 'highscores.spool'
+
+
+class LeaderboardClient:
+    def __init__(self, host, port, batch_interval=BATCH_INTERVAL, spool_file=SPOOL_FILE):
+        self.host = host
+        self.port = port
+        self.batch_interval = batch_interval
+        self.spool_file = spool_file
+        self.connected = False
+
+        self._cond = threading.Condition()
+        self._scores = {}     # mode -> top list
+        self._watched = set() # modes to ask the server for
+        self._outbox = self._read_spool() # results not sent yet
+        self._in_flight = []  # results sent but not acknowledged
+        self._spooled = bool(self._outbox) # spool_file holds results not acknowledged yet
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._run(),),
+                                        name='leaderboard-client', daemon=True)
+        self._thread.start()
+
+    # --- Leaderboard API (game thread) ---
+
+    def load_scores(self, mode='classic'):
+        with self._cond:
+            self._watched.add(mode)
+            return self._scores.get(mode, [])
+
+    def get_player_best(self, name, mode='classic'):
+        for entry in self.load_scores(mode):
+            if entry['name'] == name:
+                return entry['score']
+        return None
+
+    def save_new_score(self, name, score, mode='classic', length=None, duration=None):
+        if name == "Guest":
+            return
+        with self._cond:
+            self._outbox.append({'id': uuid.uuid4().hex, 'name': name, 'score': score, 'mode': mode,
+                                 'length': length, 'duration': duration})
+            # Show it locally until the server pushes the real list
+            scores = leaderboard.merge_score(self._scores.get(mode, []), name, score)
+            if scores is not None:
+                self._scores[mode] = scores
+
+    def flush(self, timeout=5.0):
+        """
+        Waits until the server acknowledged every result, reconnecting if needed.
+        On timeout the unacknowledged results go to the spool file and it returns False.
+        """
+        with self._cond:
+            if self._cond.wait_for(lambda: not (self._outbox or self._in_flight), timeout):
+                return True
+            self._write_spool(self._in_flight + self._outbox)
+            return False
+
+    # --- Spool file ---
+
+    def _read_spool(self):
+        if not self.spool_file or not os.path.exists(self.spool_file):
+            return []
+        try:
+            with open(self.spool_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading leaderboard spool: {e}")
+            return []
+
+    def _write_spool(self, results):
+        if not self.spool_file: return
+        try:
+            tmp_file = self.spool_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(results, f)
+            os.replace(tmp_file, self.spool_file)
+            self._spooled = True
+        except OSError as e:
+            print(f"Error saving leaderboard spool: {e}")
+
+    def _clear_spool(self):
+        # Everything that was spooled has been acknowledged
+        try:
+            os.remove(self.spool_file)
+        except OSError:
+            pass
+        self._spooled = False
+
+    # --- Network (client thread) ---
+
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+
+            with self._cond:
+                self.connected = True
+                watched = set()
+            receiver = asyncio.ensure_future(self._receive(reader))
+            try:
+                while not receiver.done():
+                    with self._cond:
+                        new_modes = self._watched - watched
+                        batch = self._outbox
+                        self._outbox = []
+                        self._in_flight.extend(batch)
+                    if new_modes:
+                        writer.write(encode({'op': 'watch', 'modes': sorted(new_modes)}))
+                        watched |= new_modes
+                    if batch:
+                        writer.write(encode({'op': 'submit', 'scores': batch}))
+                    await writer.drain()
+                    await asyncio.sleep(self.batch_interval)
+            except ConnectionError:
+                pass
+            finally:
+                receiver.cancel()
+                writer.close()
+                with self._cond:
+                    self.connected = False
+                    # Send them again after reconnecting; the server skips the ids it already stored
+                    self._outbox = self._in_flight + self._outbox
+                    self._in_flight = []
+                    self._cond.notify_all()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _receive(self, reader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+
+            with self._cond:
+                if message.get('op') == 'scores':
+                    self._scores.update(message['data'])
+                elif message.get('op') == 'ack':
+                    del self._in_flight[:message['count']]
+                    if self._spooled and not (self._outbox or self._in_flight):
+                        self._clear_spool()
+                self._cond.notify_all()
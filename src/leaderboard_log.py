@@ -0,0 +1,211 @@
+"""
+Leaderboard storage that several game processes can share.
+
+Results are appended to a log of fixed-size records under an advisory file
+lock, so writers never rewrite a whole file and can't lose each other's
+updates. The top-10 snapshot (same format as highscores.json) is rebuilt
+from the log by compact(), after which the log is truncated. Readers merge
+the snapshot with the log records they haven't seen yet.
+
+Folding a result is idempotent (a player's best only goes up), so a crash
+between writing the snapshot and truncating the log is harmless: the old
+records are simply folded in again.
+"""
+
+import json
+import os
+import struct
+import time
+from contextlib import contextmanager
+
+import leaderboard
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+# timestamp, score, mode, player name
+RECORD = struct.Struct('<di16s40s')
+COMPACT_RECORDS = 256 # Fold the log into the snapshot once it holds this many records
+
+
+@contextmanager
+def file_lock(path, shared=False, blocking=True):
+    """
+    Advisory lock on `path` (created if missing). Yields False if
+    `blocking` is False and someone else holds the lock.
+    Windows has no shared locks, readers lock exclusively there.
+    """
+    with open(path, 'a+b') as f:
+        fd = f.fileno()
+        if fcntl:
+            flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            if not blocking: flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(fd, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if not blocking:
+                        yield False
+                        return
+                    time.sleep(0.01)
+            try:
+                yield True
+            finally:
+                f.seek(0)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _encode(text, size):
+    data = text.encode('utf-8')[:size]
+    # Don't cut a multi-byte character in half
+    return data.decode('utf-8', 'ignore').encode('utf-8')
+
+def _decode(data):
+    return data.rstrip(b'\0').decode('utf-8', 'ignore')
+
+
+class LogLeaderboard:
+    def __init__(self, snapshot_file=leaderboard.SCORE_FILE, log_file='highscores.log'):
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file
+        self.lock_file = log_file + '.lock'
+
+        # What this process has merged so far
+        self._data = leaderboard.get_empty_structure()
+        self._snapshot_stamp = None
+        self._log_offset = 0
+
+    def _stamp(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _fold(self, name, score, mode):
+        scores = leaderboard.merge_score(self._data.get(mode, []), name, score)
+        if scores is not None:
+            self._data[mode] = scores
+
+    def _read_snapshot(self):
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return leaderboard.get_empty_structure()
+        except (OSError, ValueError) as e:
+            print(f"Error reading scores: {e}")
+            return self._data
+        if isinstance(data, list):
+            data = {'classic': data}
+        return data
+
+    def _refresh(self):
+        """Catches up with the snapshot and the log. Caller holds the lock."""
+        stamp = self._stamp(self.snapshot_file)
+        try:
+            log_size = os.path.getsize(self.log_file)
+        except OSError:
+            log_size = 0
+
+        # Compacted by someone (new snapshot / shorter log): start over
+        if stamp != self._snapshot_stamp or log_size < self._log_offset:
+            self._data = self._read_snapshot()
+            self._snapshot_stamp = stamp
+            self._log_offset = 0
+
+        # Only whole records; a torn tail from a crash is ignored
+        end = log_size - log_size % RECORD.size
+        if end <= self._log_offset:
+            return
+        with open(self.log_file, 'rb') as f:
+            f.seek(self._log_offset)
+            tail = f.read(end - self._log_offset)
+        for _, score, mode, name in RECORD.iter_unpack(tail):
+            self._fold(_decode(name), score, _decode(mode))
+        self._log_offset = end
+
+    # --- Leaderboard API ---
+
+    def load_scores(self, mode='classic'):
+        with file_lock(self.lock_file, shared=True):
+            self._refresh()
+        return self._data.get(mode, [])
+
+    def get_player_best(self, name, mode='classic'):
+        for entry in self.load_scores(mode):
+            if entry['name'] == name:
+                return entry['score']
+        return None
+
+    def save_new_score(self, name, score, mode='classic', length=None, duration=None):
+        if name == "Guest":
+            return
+        record = RECORD.pack(time.time(), score, _encode(mode, 16), _encode(name, 40))
+        with file_lock(self.lock_file):
+            with open(self.log_file, 'ab') as f:
+                # A crash can leave half a record; keep later records aligned
+                torn = f.tell() % RECORD.size
+                if torn:
+                    f.truncate(f.tell() - torn)
+                f.write(record)
+            self._refresh()
+            if self._log_offset >= COMPACT_RECORDS * RECORD.size:
+                self._compact()
+
+    def flush(self, timeout=5.0):
+        """
+        Appends are written before save_new_score returns, this only compacts.
+        Gives up (False) if another process holds the lock for `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.compact(blocking=False):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    # --- Compaction ---
+
+    def compact(self, blocking=True):
+        """
+        Folds the log into the snapshot and truncates the log.
+        Returns False if another process holds the lock and `blocking` is False.
+        """
+        with file_lock(self.lock_file, blocking=blocking) as locked:
+            if not locked:
+                return False
+            self._compact()
+        return True
+
+    def _compact(self):
+        self._refresh()
+        if self._log_offset == 0:
+            return
+
+        tmp_file = self.snapshot_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self._data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+        with open(self.log_file, 'r+b') as f:
+            f.truncate(0)
+
+        self._snapshot_stamp = self._stamp(self.snapshot_file)
+        self._log_offset = 0
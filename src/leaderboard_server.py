@@ -0,0 +1,151 @@
+"""
+Small leaderboard service for several cabinets sharing one leaderboard.
+
+    python src/leaderboard_server.py [--host 127.0.0.1] [--port 8765] [--backend json|sqlite|log]
+
+The protocol is one JSON object per line:
+    client -> server  {"op": "submit", "scores": [{"id", "name", "score", "mode", "length", "duration"}, ...]}
+                      {"op": "watch", "modes": [...]}
+    server -> client  {"op": "ack", "count": n}
+                      {"op": "scores", "data": {mode: [{"name", "score"}, ...]}}
+The server stores results through leaderboard.py and pushes the new top
+lists to every connected client after each batch. Storage calls run on a
+worker thread, so a slow backend (a SQLite commit) doesn't stall the loop.
+
+A client sends again the results whose ack it didn't get, so the server
+remembers the ids of the last STORED_IDS results and skips those. (With the
+SQLite backend every stored result is a row in the game history.) The ids
+are kept in memory: a restarted server only knows the ones sent since.
+"""
+
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import leaderboard
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+STORED_IDS = 10000
+
+
+def encode(message):
+    return (json.dumps(message) + '\n').encode('utf-8')
+
+
+class LeaderboardServer:
+    def __init__(self):
+        self.clients = set()
+        self.table = {} # mode -> top list, the modes clients have asked for
+        self.stored_ids = OrderedDict() # ids of the last results stored, oldest first
+        # One thread: the backends expect one call at a time
+        self.storage = ThreadPoolExecutor(max_workers=1, thread_name_prefix='leaderboard-storage')
+
+    async def run_storage(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.storage, func, *args)
+
+    async def scores(self, mode):
+        if mode not in self.table:
+            self.table[mode] = await self.run_storage(self._load, mode)
+        return self.table[mode]
+
+    def _load(self, mode):
+        return list(leaderboard.load_scores(mode))
+
+    def _store(self, entries):
+        """Saves the results (storage thread). Returns the new top lists of their modes."""
+        changed = set()
+        for entry in entries:
+            mode = entry.get('mode', 'classic')
+            leaderboard.save_new_score(entry['name'], entry['score'], mode,
+                                       length=entry.get('length'), duration=entry.get('duration'))
+            changed.add(mode)
+        return {mode: self._load(mode) for mode in changed}
+
+    async def send(self, writer, message):
+        try:
+            writer.write(encode(message))
+            await writer.drain()
+        except (ConnectionError, RuntimeError):
+            self.clients.discard(writer)
+
+    async def broadcast(self, message):
+        # Side by side, so a slow client doesn't hold up the others
+        await asyncio.gather(*(self.send(writer, message) for writer in list(self.clients)))
+
+    async def submit(self, writer, entries):
+        new_entries = []
+        for entry in entries:
+            entry_id = entry.get('id')
+            if entry_id is not None:
+                if entry_id in self.stored_ids:
+                    continue # Sent again after a lost ack
+                self.stored_ids[entry_id] = True
+                if len(self.stored_ids) > STORED_IDS:
+                    self.stored_ids.popitem(last=False)
+            new_entries.append(entry)
+
+        changed = await self.run_storage(self._store, new_entries) if new_entries else {}
+        self.table.update(changed)
+
+        await self.send(writer, {'op': 'ack', 'count': len(entries)})
+        if changed:
+            await self.broadcast({'op': 'scores', 'data': changed})
+
+    async def handle(self, reader, writer):
+        self.clients.add(writer)
+        await self.send(writer, {'op': 'scores', 'data': dict(self.table)})
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    print(f"Leaderboard server: bad message {line[:80]!r}")
+                    continue
+
+                if message.get('op') == 'submit':
+                    await self.submit(writer, message.get('scores', []))
+                elif message.get('op') == 'watch':
+                    modes = message.get('modes', [])
+                    await self.send(writer, {'op': 'scores', 'data': {mode: await self.scores(mode) for mode in modes}})
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Leaderboard server listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared leaderboard server")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--backend', choices=['json', 'sqlite', 'log'], default='json')
+    args = parser.parse_args()
+
+    if args.backend == 'sqlite':
+        leaderboard.use_sqlite(config.LEADERBOARD_DB)
+    elif args.backend == 'log':
+        leaderboard.use_log(config.LEADERBOARD_LOG)
+
+    try:
+        asyncio.run(LeaderboardServer().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        leaderboard.flush()
+
+
+if __name__ == '__main__':
+    main()
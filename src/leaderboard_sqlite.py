@@ -0,0 +1,172 @@
+"""
+SQLite storage engine for the leaderboard.
+
+Keeps every finished game in `games`, plus each player's best score per mode
+in `best`, so top-k and per-player-best lookups are index range scans no
+matter how long the history gets.
+
+Enable it with leaderboard.use_sqlite('highscores.db'), or import the JSON
+scores by hand:
+    python src/leaderboard_sqlite.py migrate highscores.json highscores.db
+"""
+
+import json
+import sqlite3
+import time
+
+from ranks import ScoreRanks
+
+TOP_K = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id        INTEGER PRIMARY KEY,
+    player    TEXT    NOT NULL,
+    mode      TEXT    NOT NULL,
+    score     INTEGER NOT NULL,
+    length    INTEGER,
+    duration  REAL,
+    played_at REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_mode_score ON games (mode, score);
+CREATE INDEX IF NOT EXISTS games_player ON games (player, mode);
+
+CREATE TABLE IF NOT EXISTS best (
+    mode   TEXT    NOT NULL,
+    player TEXT    NOT NULL,
+    score  INTEGER NOT NULL,
+    PRIMARY KEY (mode, player)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS best_mode_score ON best (mode, score, player);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SQLiteLeaderboard:
+    def __init__(self, db_file):
+        self.db_file = db_file
+        # The leaderboard server opens it on the main thread and uses it from its storage thread
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        # WAL keeps commits cheap and lets other processes read while we write
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self._ranks = None # mode -> ScoreRanks, built on first use
+
+    # --- Writes ---
+
+    def _insert(self, name, score, mode, length=None, duration=None, played_at=None):
+        if played_at is None: played_at = time.time()
+        self.conn.execute(
+            "INSERT INTO games (player, mode, score, length, duration, played_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (name, mode, score, length, duration, played_at))
+        self.conn.execute(
+            "INSERT INTO best (mode, player, score) VALUES (?, ?, ?) "
+            "ON CONFLICT (mode, player) DO UPDATE SET score = excluded.score WHERE excluded.score > best.score",
+            (mode, name, score))
+
+    def save_new_score(self, name, score, mode='classic', length=None, duration=None):
+        """Records the finished game. Guest games go into the history only."""
+        with self.conn:
+            if name == "Guest":
+                self.conn.execute(
+                    "INSERT INTO games (player, mode, score, length, duration, played_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (name, mode, score, length, duration, time.time()))
+            else:
+                self._insert(name, score, mode, length, duration)
+        if self._ranks is not None:
+            self._ranks.setdefault(mode, ScoreRanks()).add(score)
+
+    def flush(self, timeout=5.0):
+        # Every save is committed right away
+        return True
+
+    # --- Queries ---
+
+    def load_scores(self, mode='classic', limit=TOP_K):
+        rows = self.conn.execute(
+            "SELECT player, score FROM best WHERE mode = ? ORDER BY score DESC LIMIT ?",
+            (mode, limit)).fetchall()
+        return [{'name': player, 'score': score} for player, score in rows]
+
+    def get_player_best(self, name, mode='classic'):
+        row = self.conn.execute(
+            "SELECT score FROM best WHERE mode = ? AND player = ?", (mode, name)).fetchone()
+        return row[0] if row else None
+
+    def prepare_ranks(self):
+        """Loads the score distribution of every mode (one index scan)."""
+        if self._ranks is not None:
+            return
+        counts = {}
+        for mode, score, count in self.conn.execute("SELECT mode, score, COUNT(*) FROM games GROUP BY mode, score"):
+            counts.setdefault(mode, {})[score] = count
+        self._ranks = {mode: ScoreRanks(mode_counts) for mode, mode_counts in counts.items()}
+
+    def get_rank(self, score, mode='classic'):
+        """(rank, top percent) of `score` among every game played in `mode`."""
+        self.prepare_ranks()
+        ranks = self._ranks.get(mode)
+        if ranks is None or ranks.total == 0:
+            return None
+        return ranks.rank(score), ranks.top_percent(score)
+
+    def history(self, mode=None, player=None, limit=100):
+        """Most recent games as dicts, optionally filtered by mode and/or player."""
+        query = "SELECT player, mode, score, length, duration, played_at FROM games"
+        conditions, args = [], []
+        if mode is not None:
+            conditions.append("mode = ?")
+            args.append(mode)
+        if player is not None:
+            conditions.append("player = ?")
+            args.append(player)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id DESC LIMIT ?"
+        args.append(limit)
+        keys = ('player', 'mode', 'score', 'length', 'duration', 'played_at')
+        return [dict(zip(keys, row)) for row in self.conn.execute(query, args)]
+
+    # --- Migration ---
+
+    def migrate_from_json(self, json_file):
+        """
+        One-shot import of highscores.json (best scores only, no history).
+        Returns the number of imported entries, 0 if it already ran.
+        """
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone():
+            return 0
+
+        with open(json_file, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            data = {'classic': data}
+
+        count = 0
+        with self.conn:
+            for mode, entries in data.items():
+                for entry in entries:
+                    self._insert(entry['name'], entry['score'], mode, played_at=0.0)
+                    count += 1
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_json', ?)", (json_file,))
+        self._ranks = None
+        return count
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) != 4 or sys.argv[1] != 'migrate':
+        print("usage: python leaderboard_sqlite.py migrate <highscores.json> <highscores.db>")
+        sys.exit(1)
+    board = SQLiteLeaderboard(sys.argv[3])
+    print(f"Imported {board.migrate_from_json(sys.argv[2])} scores into {sys.argv[3]}")
+    board.close()
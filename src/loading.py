@@ -0,0 +1,80 @@
+"""
+Staged startup.
+Loading work is split into named stages that run one per frame after the
+window is open, so a loading screen can draw and report progress between them.
+"""
+
+import time
+from ursina import application
+
+
+class StartupLoader:
+    """
+    Runs queued stages on consecutive frames.
+
+    Listeners are called as listener(stage_name, done, total) after every stage,
+    and once more with stage_name=None when everything has loaded.
+    """
+    def __init__(self, launch_time=None):
+        self.launch_time = launch_time if launch_time is not None else time.perf_counter()
+        self.stages = []
+        self.listeners = []
+        self.timings = [] # (name, seconds) in the order they happened
+        self.done = 0
+        self.finished = False
+        self.frame_time = 0.0 # time spent drawing frames between stages
+        self._last_mark = self.launch_time
+
+    def mark(self, name):
+        """Records the time spent since the previous mark (e.g. engine init before stages)."""
+        now = time.perf_counter()
+        self.timings.append((name, now - self._last_mark))
+        self._last_mark = now
+
+    def add_stage(self, name, func):
+        self.stages.append((name, func))
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def start(self):
+        # The first frame only draws the window and loading screen
+        self.mark('first frame setup')
+        application.base.taskMgr.doMethodLater(0, self._run_next, 'startup_loader')
+
+    def _run_next(self, task):
+        start = time.perf_counter()
+        self.frame_time += start - self._last_mark
+        if self.done >= len(self.stages):
+            self._finish()
+            return task.done
+
+        name, func = self.stages[self.done]
+        func()
+        self.timings.append((name, time.perf_counter() - start))
+        self.done += 1
+        self._last_mark = time.perf_counter()
+
+        for listener in self.listeners:
+            listener(name, self.done, len(self.stages))
+        return task.again
+
+    def _finish(self):
+        self.finished = True
+        self.timings.append(('frames between stages', self.frame_time))
+        for listener in self.listeners:
+            listener(None, self.done, len(self.stages))
+        print(self.report())
+
+    @property
+    def progress(self):
+        return self.done / len(self.stages) if self.stages else 1.0
+
+    def report(self):
+        total = time.perf_counter() - self.launch_time
+        lines = ['--- Startup timing ---']
+        for name, seconds in self.timings:
+            share = seconds / total * 100 if total > 0 else 0
+            lines.append(f'{name:<28}{seconds * 1000:8.1f} ms {share:5.1f}%')
+        lines.append(f'{"total":<28}{total * 1000:8.1f} ms')
+        return '\n'.join(lines)
@@ -0,0 +1,183 @@
+"""
+Levels of detail of the OBJ models: built once with the command below, and
+loaded under a LODNode by lod_model().
+
+Each level is a copy of the model simplified by vertex clustering: the
+model's bounding box is cut in `cells` x `cells` x `cells` boxes, all the
+vertices of a box are merged into their mean, and the faces that collapse
+are dropped. Texture coordinates, normals and materials are kept. Level i
+uses the finest grid that keeps at most LOD_RATIOS[i - 1] of the vertices.
+
+    python src/lod.py build [--assets assets]
+
+writes assets/<model>_lod1.obj, assets/<model>_lod2.obj, ... (with a copy of
+<model>.mtl, which ursina looks up by the obj's name) for the models in config,
+and removes a stale compressed .bam of a level from src/models_compressed
+(one would be loaded instead of the new obj). Run it again after changing a model or LOD_RATIOS.
+"""
+
+import os
+import shutil
+import config
+
+ASSET_FOLDER = 'assets'
+MODELS_FOLDER = os.path.join('src', 'models_compressed')
+
+
+def level_name(name, level):
+    """Model name of a level (level 0 is the model itself)."""
+    return name if level == 0 else f'{name}_lod{level}'
+
+
+def read_obj(path):
+    """Returns (vertices, lines): vertex positions and every other line, faces as corner lists."""
+    vertices = []
+    lines = []
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if not parts: continue
+            if parts[0] == 'v':
+                vertices.append(tuple(float(c) for c in parts[1:4]))
+            elif parts[0] == 'f':
+                # Corner: (vertex index, 'vt/vn' rest), indices from 0
+                corners = []
+                for corner in parts[1:]:
+                    index, _, rest = corner.partition('/')
+                    index = int(index)
+                    corners.append((index - 1 if index > 0 else len(vertices) + index, rest))
+                lines.append(('f', corners))
+            else:
+                lines.append(('line', line.rstrip('\n')))
+    return vertices, lines
+
+
+def cluster(vertices, cells):
+    """Returns (merged vertices, old index -> merged index)."""
+    low = [min(v[i] for v in vertices) for i in range(3)]
+    high = [max(v[i] for v in vertices) for i in range(3)]
+    size = [max(high[i] - low[i], 1e-9) for i in range(3)]
+
+    clusters = {}  # cell -> merged index
+    sums = []
+    remap = []
+    for v in vertices:
+        cell = tuple(min(int((v[i] - low[i]) / size[i] * cells), cells - 1) for i in range(3))
+        if cell not in clusters:
+            clusters[cell] = len(sums)
+            sums.append([0.0, 0.0, 0.0, 0])
+        index = clusters[cell]
+        total = sums[index]
+        total[0] += v[0]; total[1] += v[1]; total[2] += v[2]; total[3] += 1
+        remap.append(index)
+    merged = [(x / n, y / n, z / n) for x, y, z, n in sums]
+    return merged, remap
+
+
+def cells_for(vertices, ratio, max_cells=64):
+    """Finest clustering grid that keeps at most `ratio` of the vertices."""
+    for cells in range(max_cells, 1, -1):
+        if len(cluster(vertices, cells)[0]) <= ratio * len(vertices):
+            return cells
+    return 1
+
+
+def simplify(vertices, lines, cells, mtl=None):
+    """
+    Returns (OBJ text, vertex count, triangle count) of the model simplified
+    with `cells` clusters per axis. `mtl` replaces the mtllib line.
+    """
+    merged, remap = cluster(vertices, cells)
+    out = [f'v {x:.6f} {y:.6f} {z:.6f}' for x, y, z in merged]
+    seen = set()
+    for kind, data in lines:
+        if kind == 'line':
+            if mtl and data.startswith('mtllib '): data = f'mtllib {mtl}'
+            out.append(data)
+            continue
+        # Fan triangulation, then drop collapsed and repeated triangles
+        corners = [(remap[index], rest) for index, rest in data]
+        for i in range(1, len(corners) - 1):
+            triangle = (corners[0], corners[i], corners[i + 1])
+            indices = tuple(c[0] for c in triangle)
+            if len(set(indices)) < 3: continue
+            key = tuple(sorted(indices))
+            if key in seen: continue
+            seen.add(key)
+            out.append('f ' + ' '.join(f'{index + 1}/{rest}' if rest else str(index + 1) for index, rest in triangle))
+    return '\n'.join(out) + '\n', len(merged), len(seen)
+
+
+def build(name, folder=ASSET_FOLDER):
+    vertices, lines = read_obj(os.path.join(folder, name + '.obj'))
+    faces = sum(len(data) - 2 for kind, data in lines if kind == 'f')
+    print(f'{name}: {len(vertices)} vertices, {faces} triangles')
+    for level, ratio in enumerate(config.LOD_RATIOS, start=1):
+        cells = cells_for(vertices, ratio)
+        level_mtl = level_name(name, level) + '.mtl'
+        mtl = os.path.join(folder, name + '.mtl')
+        if os.path.exists(mtl):
+            shutil.copyfile(mtl, os.path.join(folder, level_mtl))
+        else:
+            level_mtl = None
+        text, vertex_count, triangle_count = simplify(vertices, lines, cells, level_mtl)
+        path = os.path.join(folder, level_name(name, level) + '.obj')
+        with open(path, 'w') as f:
+            f.write(f'# Level {level} of {name}.obj ({cells} clusters per axis), built by src/lod.py\n')
+            f.write(text)
+        bam = os.path.join(MODELS_FOLDER, level_name(name, level) + '.bam')
+        if os.path.exists(bam): os.remove(bam)
+        print(f'  {path}: {vertex_count} vertices, {triangle_count} triangles')
+
+
+# --- Loading ---
+
+_models = {} # (name, scale) -> LODNode NodePath, or None if there are no levels
+
+def lod_model(name, scale=1):
+    """
+    A model for Entity(model=...): `name` and its levels under a LODNode that
+    switches at config.LOD_DISTANCES (world units, for an entity of `scale`).
+    Just `name` if its levels haven't been built.
+    """
+    from ursina import load_model
+    from panda3d.core import LODNode, NodePath
+
+    key = (name, scale)
+    if key not in _models:
+        levels = []
+        for level in range(len(config.LOD_DISTANCES) + 1):
+            model = load_model(level_name(name, level))
+            if not model: break
+            levels.append(model)
+
+        if len(levels) < 2:
+            _models[key] = None
+        else:
+            # The switch distances are in the LODNode's space, scaled with the entity
+            switches = [0] + [distance / scale for distance in config.LOD_DISTANCES[:len(levels) - 1]] + [1e6]
+            node = LODNode(f'{name} lod')
+            root = NodePath(node)
+            for level, model in enumerate(levels):
+                model.reparentTo(root)
+                node.addSwitch(switches[level + 1], switches[level])
+            _models[key] = root
+
+    if _models[key] is None:
+        return name
+    # Shares the geometry with the loaded levels
+    return NodePath(_models[key].node().copySubgraph())
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the LOD models")
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--assets', default=ASSET_FOLDER)
+    args = parser.parse_args()
+    for name in (config.SNAKE_HEAD_MODEL, config.SNAKE_FOOD_MODEL, config.SNAKE_BODY_MODEL):
+        build(name, args.assets)
+
+
+if __name__ == '__main__':
+    main()
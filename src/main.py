@@ -3,21 +3,33 @@ Main entry point of the game.
 With DEBUG INPUT enabled.
 """
 
+import time
+LAUNCH_TIME = time.perf_counter()
+
 from ursina import *
 from pathlib import Path
-import time
-import random
 
 # Game Imports
 from player import Snake
 from food import Food
-from world import WorldGrid
+from obstacles import Obstacles
 from camera import SnakeCamera
 from ai import AISnake
 import leaderboard
+import telemetry
+import culling
+import scheduler
+import governor
 import config
-from config import BACKGROUND_COLOR, FULLSCREEN, SNAKE_SPEED, OBSTACLE_COLOR, GRID_SIZE
-from ui import GameOverUI, MainMenu, GameHUD
+import vec
+import world
+from config import FULLSCREEN, SNAKE_SPEED, GRID_SIZE
+from palette import BACKGROUND_COLOR
+from views import SnakeView, AISnakeView, FoodView, ObstaclesView, WorldGrid, ChunkedGrid
+from ui import GameOverUI, MainMenu, GameHUD, LoadingScreen, preload_fonts
+from sound import GameAudio
+from loading import StartupLoader
+from lod import lod_model
 
 # --- Asset Path Setup ---
 # Set asset folder to the project root (parent of 'src')
@@ -37,8 +49,12 @@ if bad_cache.exists():
     except Exception as e:
         print(f"Warning: Could not clean cache: {e}")
 
+startup = StartupLoader(launch_time=LAUNCH_TIME)
+startup.mark('python imports')
+
 # --- Setup Window ---
 app = Ursina(fullscreen=FULLSCREEN)
+startup.mark('engine + window init')
 
 # window.size = (1920, 1080)
 window.color = BACKGROUND_COLOR
@@ -59,21 +75,36 @@ background = Entity(
 )
 
 # --- Global Variables ---
-grid = WorldGrid()
-grid.enabled = False
+# Loaded by the startup stages at the bottom of this file
+grid = None
+chunk_grid = None
+audio = None
+
+telemetry_store = telemetry.TelemetryStore(config.TELEMETRY_FOLDER) if config.TELEMETRY_ENABLED else None
+game_stats = None # telemetry.GameStats of the game being played
+
+if config.LEADERBOARD_BACKEND == 'sqlite':
+    leaderboard.use_sqlite(config.LEADERBOARD_DB)
+elif config.LEADERBOARD_BACKEND == 'log':
+    leaderboard.use_log(config.LEADERBOARD_LOG)
+elif config.LEADERBOARD_BACKEND == 'server':
+    leaderboard.use_server(*config.LEADERBOARD_SERVER, spool_file=config.LEADERBOARD_SPOOL)
 
 snake = None
 ai_snake = None
 food = None
-obstacles = []
+obstacles = None
 camera_controller = None
 current_mode = None 
 current_player_name = "Guest"
 current_cam_mode = 'follow'
 current_is_aggressive = False
+preview_active = False # The menu preview is running (see update_preview)
+preview_food = {}      # mode -> food position shown in its preview
 
 # Game State
 game_unpause_time = 0.0
+game_start_time = 0.0
 score = 0
 
 # UI States
@@ -81,34 +112,37 @@ main_menu = None
 game_over_ui = None
 game_hud = None
 
-# Audio
-bg_music = Audio('bgm.wav', loop=True, autoplay=False, volume=0.5, eternal=True)
-eat_sound = Audio('eat apple.wav', loop=False, autoplay=False)
-crash_sound = Audio('game-over-arcade-6435.wav', loop=False, autoplay=False)
-click_sound = Audio('button.wav', loop=False, autoplay=False)
-# Audio Engine "Keep Alive" Workaround
-# Fixes issue where music stops if no other sound plays for a while.
-keep_alive_sound = Audio('button.wav', loop=False, autoplay=False, volume=0.0) 
-last_keep_alive_time = 0.0
-
 # --- GAME LOGIC ---
 
 def get_occupied_positions():
     positions = []
     if snake:
-        positions.extend([s.position for s in snake.body])
+        positions.extend(snake.body)
     if ai_snake:
-        positions.extend([s.position for s in ai_snake.body])
-    positions.extend([obs.position for obs in obstacles])
+        positions.extend(ai_snake.body)
+    if obstacles:
+        positions.extend(obstacles.positions)
     return positions
 
+def show_grid(size):
+    """Dense grid shells up to MAX_GRID_SIZE, chunks around the camera above that."""
+    if not grid: return
+    huge = size > config.MAX_GRID_SIZE
+    grid.enabled = not huge
+    chunk_grid.enabled = huge
+    if huge:
+        chunk_grid.set_size(size)
+    else:
+        grid.set_size(size)
+
 def start_game(mode, player_name="Guest", cam_mode='follow', is_aggressive=False, preview=False, grid_size=None):
-    global snake, ai_snake, food, camera_controller, current_mode, grid, game_hud, current_cam_mode, current_is_aggressive, game_unpause_time, current_player_name
+    global snake, ai_snake, food, obstacles, camera_controller, current_mode, grid, game_hud, current_cam_mode, current_is_aggressive, game_unpause_time, current_player_name, game_start_time, game_stats, preview_active
     
     if snake or ai_snake or food:
         stop_game()
         
     game_unpause_time = 0.0
+    game_start_time = time.time()
     if not preview:
         main_menu.enabled = False
     
@@ -116,65 +150,124 @@ def start_game(mode, player_name="Guest", cam_mode='follow', is_aggressive=False
     current_player_name = player_name
     current_cam_mode = cam_mode
     current_is_aggressive = is_aggressive
+    preview_active = preview
     
     # Handle Grid Size
     if grid_size is not None:
         config.GRID_SIZE = grid_size
 
     # Audio Logic
-    if not preview and not bg_music.playing:
-        bg_music.play()
-    elif preview and bg_music.playing:
-        bg_music.stop()
+    if not preview:
+        audio.play_music()
+    else:
+        audio.stop_music()
     
     # Grid
-    if grid:
-        grid.set_size(config.GRID_SIZE)
-        grid.enabled = True
+    show_grid(config.GRID_SIZE)
     
     # Reset Logic
-    if snake: snake.destroy_entities()
+    if snake and snake.view: snake.view.destroy()
     snake = None
     if ai_snake: 
         ai_snake.reset()
         ai_snake = None
     if food: 
-        destroy(food)
+        if food.view: food.view.destroy()
         food = None
     
-    for obs in obstacles: destroy(obs)
-    obstacles.clear()
+    if obstacles:
+        if obstacles.view: obstacles.view.destroy()
+        obstacles = None
 
-    if camera_controller: 
-        destroy(camera_controller)
-        camera_controller = None
     if game_hud and not preview: 
         destroy(game_hud)
         game_hud = None
 
     # Spawn Entities
     snake = Snake()
-    
-    if cam_mode in ['orbital', 'topdown']:                                                                                 
-       snake.set_strategy('standard')                                                                                                     
-    else:                                                                                                                   
-       snake.set_strategy('free_roam')
+    SnakeView(snake)
 
     if current_mode in ['ai', 'ai_hard']:
         ai_snake = AISnake(start_pos=(3, 0, 3), aggressive_mode=is_aggressive)
+        AISnakeView(ai_snake)
     else:
         ai_snake = None 
 
-    food = Food(occupied_positions=get_occupied_positions())
+    obstacles = Obstacles()
+    ObstaclesView(obstacles)
+
+    food = Food(occupied_positions=get_occupied_positions(), near=snake.head)
+    FoodView(food)
     
-    camera_controller = SnakeCamera(snake)
-    camera_controller.set_mode(cam_mode)
+    # The camera controller is kept between games, it just follows the new snake
+    if camera_controller:
+        camera_controller.set_snake(snake)
+    else:
+        camera_controller = SnakeCamera(snake)
+    set_cam_mode(cam_mode)
     
     # Initialize HUD
     if not preview:
         game_hud = GameHUD(player_name, current_mode)
         update_score(0)
 
+    game_stats = None
+    if telemetry_store and not preview:
+        ai_mode = ('aggressive' if is_aggressive else 'normal') if ai_snake else 'none'
+        game_stats = telemetry.GameStats(current_mode, config.GRID_SIZE, cam_mode, ai_mode)
+
+    # Previews only show the snakes, they don't move
+    scheduler.set_active('game', not preview)
+    governor.set_state('menu' if preview else 'play', camera_controller.smoothing())
+
+def set_cam_mode(cam_mode):
+    global current_cam_mode
+    current_cam_mode = cam_mode
+    if cam_mode in ['orbital', 'topdown']:
+       snake.set_strategy('standard')
+    else:
+       snake.set_strategy('free_roam')
+    camera_controller.set_mode(cam_mode)
+
+def update_preview(mode, cam_mode='follow', is_aggressive=False, grid_size=None):
+    """
+    Shows `mode` in the menu preview. A running preview is reconfigured
+    (grid size, AI snake, camera) instead of being torn down and rebuilt.
+    """
+    global ai_snake, current_mode, current_is_aggressive
+    if not preview_active or not snake:
+        start_game(mode, "Guest", cam_mode, is_aggressive, preview=True, grid_size=grid_size)
+        preview_food[mode] = food.position
+        return
+
+    if grid_size is not None and grid_size != config.GRID_SIZE:
+        config.GRID_SIZE = grid_size
+        show_grid(grid_size)
+        camera_controller.set_snake(snake) # Camera distances depend on the grid size
+
+    if mode in ['ai', 'ai_hard'] and not ai_snake:
+        ai_snake = AISnake(start_pos=(3, 0, 3), aggressive_mode=is_aggressive)
+        AISnakeView(ai_snake)
+    elif mode not in ['ai', 'ai_hard'] and ai_snake:
+        ai_snake.reset()
+        ai_snake = None
+    if ai_snake: ai_snake.aggressive_mode = is_aggressive
+
+    if cam_mode != current_cam_mode:
+        set_cam_mode(cam_mode)
+
+    # Each mode keeps showing the food where it was the last time
+    position = preview_food.get(mode)
+    if position is None or world.is_outside(position) or position in get_occupied_positions():
+        food.reposition(occupied_positions=get_occupied_positions(), near=snake.head)
+        preview_food[mode] = food.position
+    elif position != food.position:
+        food.position = position
+        food.view.on_reposition()
+
+    current_mode = mode
+    current_is_aggressive = is_aggressive
+
 def update_score(new_val):
     global score
     score = new_val
@@ -182,11 +275,12 @@ def update_score(new_val):
         game_hud.update_score(score)
 
 def stop_game():
-    global snake, ai_snake, food, camera_controller, game_over_ui, game_hud
+    global snake, ai_snake, food, obstacles, camera_controller, game_over_ui, game_hud, preview_active
+    preview_active = False
+    scheduler.set_active('game', False)
     
     if snake:
-        for segment in snake.body: destroy(segment)
-        snake.destroy_entities()
+        if snake.view: snake.view.destroy()
         snake = None
         
     if ai_snake:
@@ -194,15 +288,15 @@ def stop_game():
         ai_snake = None
         
     if food:
-        destroy(food)
+        if food.view: food.view.destroy()
         food = None
 
-    for obs in obstacles: destroy(obs)
-    obstacles.clear()
+    if obstacles:
+        if obstacles.view: obstacles.view.destroy()
+        obstacles = None
         
     if camera_controller:
-        destroy(camera_controller)
-        camera_controller = None
+        camera_controller.set_snake(None)
 
     if game_over_ui:
         destroy(game_over_ui)
@@ -218,14 +312,19 @@ def restart_game():
 
 def show_menu():
     stop_game()
-    bg_music.stop()
+    governor.set_state('menu')
+    audio.stop_music()
     main_menu.update_leaderboard()
     main_menu.enabled = True
     main_menu.update_mode_display()
 
 def check_highscore_and_end(message):
-    global game_over_ui
-    leaderboard.save_new_score(current_player_name, score, current_mode)
+    global game_over_ui, game_stats
+    leaderboard.save_new_score(current_player_name, score, current_mode,
+                               length=len(snake.body), duration=time.time() - game_start_time)
+    if game_stats:
+        telemetry_store.queue_append(game_stats.finish(message))
+        game_stats = None
     
     game_over_ui = GameOverUI(
         player_name=current_player_name,
@@ -234,12 +333,14 @@ def check_highscore_and_end(message):
         restart_callback=restart_game,
         menu_callback=show_menu
     )
-    crash_sound.play()
-    bg_music.stop()
+    audio.play('crash')
+    audio.stop_music()
+    scheduler.set_active('game', False)
+    governor.set_state('game over')
     
     if snake: 
-        snake.direction = Vec3(0,0,0)
-        snake.destroy_entities() 
+        snake.direction = vec.Vec3(0,0,0)
+        if snake.view: snake.view.destroy_head()
     if ai_snake: 
         ai_snake.alive = False
 
@@ -247,82 +348,56 @@ def spawn_obstacle():
     occupied = get_occupied_positions()
     if food: occupied.append(food.position)
     
-    half_grid = config.GRID_SIZE // 2
-    valid_pos = None
-    
-    for _ in range(100):
-        pos_tuple = (
-            random.randint(-half_grid + 1, half_grid - 1),
-            random.randint(-half_grid + 1, half_grid - 1),
-            random.randint(-half_grid + 1, half_grid - 1)
-        )
-        is_occupied = False
-        for occ in occupied:
-            if round(occ.x) == pos_tuple[0] and round(occ.y) == pos_tuple[1] and round(occ.z) == pos_tuple[2]:
-                is_occupied = True
-                break
-        if not is_occupied:
-            valid_pos = pos_tuple
-            break
+    valid_pos = world.find_free_cell(occupied, near=snake.head)
             
     if valid_pos:
-        obs = Entity(model='cube', color=OBSTACLE_COLOR, scale=1, position=valid_pos)
-        obstacles.append(obs)
+        obstacles.add(valid_pos)
 
-def update():
-    global game_unpause_time, last_keep_alive_time
+def update_game():
+    """One frame of the game being played ('game' scheduler system, off in menus and previews)."""
+    global game_unpause_time
     
+    if not startup.finished: return
     if main_menu and main_menu.enabled: return
 
-    # Ensure background music is playing if the game is active (and not Game Over)
-    # This fixes an issue where music might stop unexpectedly.
-    if snake and not game_over_ui and not bg_music.playing:
-        bg_music.play()
-
-    # AUDIO WORKAROUND: Play a silent sound every 1.5s to keep the audio engine "awake"
-    # This prevents the background music from pausing due to driver timeouts/sleeping.
-    if snake and not game_over_ui and time.time() - last_keep_alive_time > 1.5:
-        keep_alive_sound.play()
-        last_keep_alive_time = time.time()
-
     if time.time() < game_unpause_time: return
     if not snake: return 
 
     if ai_snake and ai_snake.alive and snake.direction.length() > 0:
         ai_snake.decide_move(food, snake)
-        if ai_snake.head.position == food.position:
+        if ai_snake.head == food.position:
             ai_snake.grow()
-            food.reposition(occupied_positions=get_occupied_positions())
-        for segment in snake.body:
-            if ai_snake.head.position == segment.position:
-                check_highscore_and_end("The AI ate you!")
-                return
+            food.reposition(occupied_positions=get_occupied_positions(), near=snake.head)
+        if ai_snake.head in snake.body:
+            check_highscore_and_end("The AI ate you!")
+            return
 
     if snake.direction.length() > 0:
-        if time.time() - snake.last_move_time > 1 / SNAKE_SPEED:
-            snake.last_move_time = time.time()
+        now = time.time()
+        interval = 1 / SNAKE_SPEED
+        if now - snake.last_move_time > interval:
+            # Count from the last tick, not from this frame, so capped frames don't make ticks late.
+            # More than a tick behind (a stall, a pause): start over instead of catching up.
+            snake.last_move_time += interval
+            if now - snake.last_move_time > interval: snake.last_move_time = now
             snake.handle_turn()
 
             if snake.will_collide(config.GRID_SIZE):
                 check_highscore_and_end("You crashed!")
                 return
             
-            if ai_snake:
-                next_pos = snake.head.position + snake.direction.normalized()
-                for segment in ai_snake.body:
-                    if next_pos == segment.position:
-                        check_highscore_and_end("You hit the AI!")
-                        return
+            if ai_snake and snake.next_head_position() in ai_snake.body:
+                check_highscore_and_end("You hit the AI!")
+                return
 
             snake.move()
+            if game_stats: game_stats.tick()
             
-            if current_mode == 'obstacles':
-                for obs in obstacles:
-                    if snake.head.position == obs.position:
-                        check_highscore_and_end("You crashed into an obstacle!")
-                        return
+            if current_mode == 'obstacles' and snake.head in obstacles:
+                check_highscore_and_end("You crashed into an obstacle!")
+                return
 
-            if snake.head.position == food.position:
+            if snake.head == food.position:
                 if current_mode == 'reverse':
                     snake.reverse_and_grow()
                     game_unpause_time = time.time() + 0.75
@@ -332,17 +407,31 @@ def update():
                 else:
                     snake.grow()
                 
-                food.reposition(occupied_positions=get_occupied_positions())
+                food.reposition(occupied_positions=get_occupied_positions(), near=snake.head)
                 update_score(score + 1)
-                eat_sound.play()
+                audio.play('eat')
+                if game_stats: game_stats.food()
+
+scheduler.add('game', update_game, scheduler.GAME, active=False)
 
 def input(key):
     # Mouse interaction
     if key == 'left mouse down':
-        if mouse.hovered_entity and isinstance(mouse.hovered_entity, Button):
-            click_sound.play()
-
-    if key == 'escape': application.quit()
+        if audio and mouse.hovered_entity and isinstance(mouse.hovered_entity, Button):
+            audio.play('click')
+
+    if key == 'escape': quit_game()
+    if not startup.finished: return
+
+    # Render metrics (DEBUG)
+    if key == 'f3':
+        for name, (drawn, shown, total) in culling.stats().items():
+            print(f"[Render] {name}: {drawn} drawn, {shown} shown, {total} nodes")
+        for name, (active, calls, mean_ms, last_ms) in scheduler.stats().items():
+            print(f"[Frame] {name}: {'on' if active else 'off'}, {calls} calls, {mean_ms:.3f} ms mean, {last_ms:.3f} ms last")
+        print("[Frame pacing]", ', '.join(f"{k}: {v:.2f}" if isinstance(v, float) else f"{k}: {v}" for k, v in governor.stats().items()))
+        if audio:
+            print("[Audio]", ', '.join(f"{k}: {v}" for k, v in audio.stats().items()))
 
     # Gamepad Mapping
     mapped_key = None
@@ -374,15 +463,73 @@ def input(key):
         if key == 'r': restart_game()
         if key == 'm' or key =='gamepad start': show_menu()
 
+def quit_game():
+    # Make sure the last score is on disk before the process exits
+    leaderboard.flush()
+    if telemetry_store: telemetry_store.flush()
+    application.quit()
+
 def on_menu_mode_changed(mode, cam_mode, is_aggressive, grid_size):
-    start_game(mode, "Guest", cam_mode, is_aggressive, preview=True, grid_size=grid_size)
+    update_preview(mode, cam_mode, is_aggressive, grid_size)
 
 # --- STARTUP ---
-main_menu = MainMenu(start_game, application.quit, bg_music, grid, on_menu_mode_changed)
-
-# Initialize preview
-start_game('classic', "Guest", 'follow', False, preview=True, grid_size=8)
-main_menu.enabled = True 
+# The window and loading screen show first, everything else loads one stage per frame.
+loading_screen = LoadingScreen()
+
+def load_grid():
+    global grid, chunk_grid
+    grid = WorldGrid(lazy=True)
+    grid.enabled = False
+    chunk_grid = ChunkedGrid()
+    chunk_grid.enabled = False
+
+def load_audio():
+    global audio
+    # Music is streamed (opened on first play), SFX are preloaded into a voice bank.
+    # GameAudio's watchdog resumes the music if its stream stops.
+    audio = GameAudio('bgm.wav', music_volume=0.5, voices=2)
+    audio.load_sfx({
+        'eat': 'eat apple.wav',
+        'crash': 'game-over-arcade-6435.wav',
+        'click': 'button.wav',
+    })
+    audio.start()
+
+def load_menu():
+    global main_menu
+    main_menu = MainMenu(start_game, quit_game, audio.music, grid, on_menu_mode_changed)
+    main_menu.enabled = False
+
+def load_preview():
+    update_preview('classic', 'follow', False, grid_size=8)
+
+def on_startup_progress(stage_name, done, total):
+    global loading_screen
+    if stage_name:
+        loading_screen.on_progress(stage_name, done, total)
+        return
+    # All stages loaded
+    destroy(loading_screen)
+    loading_screen = None
+    main_menu.enabled = True
+    governor.set_state('menu')
+
+# lod_model loads the model with its levels, at the scales the views use
+for model_name, scales in ((config.SNAKE_BODY_MODEL, (config.SNAKE_BODY_SCALE, 1)),
+                           (config.SNAKE_HEAD_MODEL, (config.SNAKE_HEAD_SCALE,)),
+                           (config.SNAKE_FOOD_MODEL, (config.FOOD_SCALE,))):
+    startup.add_stage(f'model {model_name}', lambda name=model_name, scales=scales: [lod_model(name, scale) for scale in scales])
+startup.add_stage('grid', load_grid)
+for r in range(config.MAX_GRID_SIZE // 2 + 1):
+    startup.add_stage(f'grid shell {r}', lambda r=r: grid.build_shell(r))
+startup.add_stage('fonts', preload_fonts)
+startup.add_stage('audio', load_audio)
+startup.add_stage('leaderboard ranks', leaderboard.prepare_ranks)
+startup.add_stage('menu', load_menu)
+startup.add_stage('preview', load_preview)
+startup.add_listener(on_startup_progress)
+governor.set_state('loading')
+startup.start()
 
 if __name__ == '__main__':
     app.run()
@@ -0,0 +1,24 @@
+"""
+Obstacles left behind in the obstacles mode.
+Game logic only: they are drawn as one mesh by views.ObstaclesView.
+"""
+
+from vec import Vec3
+import world
+
+
+class Obstacles:
+    def __init__(self):
+        self.positions = [] # In spawn order
+        self.cells = world.ChunkedCells() # Same positions, for O(1) collision checks
+        self.view = None # Set by views.ObstaclesView
+
+    def __contains__(self, position):
+        return position in self.cells
+
+    def add(self, position):
+        position = Vec3(*position)
+        if position in self.cells: return
+        self.positions.append(position)
+        self.cells.add(position)
+        if self.view: self.view.on_add(position)
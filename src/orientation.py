@@ -0,0 +1,40 @@
+"""
+Axis-aligned orientations of the snake head.
+
+A (direction, up) pair of perpendicular axis vectors is one of the 24
+rotations of the cube. Turning rules are run once per orientation at import
+time and stored as tables, so a turn in the game is a table lookup and
+direction/up always stay exact integer vectors.
+"""
+
+from vec import Vec3
+
+AXES = (Vec3(1, 0, 0), Vec3(-1, 0, 0), Vec3(0, 1, 0), Vec3(0, -1, 0), Vec3(0, 0, 1), Vec3(0, 0, -1))
+AXIS_INDEX = {axis: i for i, axis in enumerate(AXES)}
+
+# (direction, up) pairs, index = orientation id
+ORIENTATIONS = tuple((direction, up) for direction in AXES for up in AXES if direction.dot(up) == 0)
+ORIENTATION_INDEX = {pair: i for i, pair in enumerate(ORIENTATIONS)}
+
+TURN_KEYS = ('w', 'a', 's', 'd', 'q', 'e')
+
+
+def index_of(direction, up):
+    return ORIENTATION_INDEX[(direction, up)]
+
+
+def build_turn_table(turn):
+    """
+    turn(direction, up, key) -> (direction, up).
+    Returns table[orientation][key] -> orientation, keys that don't turn
+    are left out.
+    """
+    table = []
+    for direction, up in ORIENTATIONS:
+        row = {}
+        for key in TURN_KEYS:
+            result = turn(direction, up, key)
+            if result != (direction, up):
+                row[key] = ORIENTATION_INDEX[result]
+        table.append(row)
+    return tuple(table)
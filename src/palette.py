@@ -0,0 +1,38 @@
+"""
+Engine colors built from the plain values in config.py.
+Presentation code imports colors from here, game logic never needs to.
+"""
+
+from ursina import color, lerp
+import config
+
+
+def to_color(value):
+    """'#RRGGBB' hex strings or ursina color names ('gray', 'orange', ...)."""
+    if value.startswith('#'):
+        return color.hex(value)
+    return getattr(color, value)
+
+
+BACKGROUND_COLOR = to_color(config.BACKGROUND_COLOR)
+SNAKE_COLOR = to_color(config.SNAKE_COLOR)
+SNAKE_HEAD_COLOR = to_color(config.SNAKE_HEAD_COLOR)
+FOOD_COLOR = to_color(config.FOOD_COLOR)
+OBSTACLE_COLOR = to_color(config.OBSTACLE_COLOR)
+GRID_COLOR = to_color(config.GRID_COLOR)
+BOUNDARY_COLOR = to_color(config.BOUNDARY_COLOR)
+AI_COLOR = to_color(config.AI_COLOR)
+
+
+def gradient(start, end, start_alpha=1.0, end_alpha=1.0, steps=config.GRADIENT_STEPS):
+    """`steps` colors going from start to end (slot 0 = head end)."""
+    colors = []
+    for k in range(steps):
+        ratio = k / (steps - 1)
+        c = lerp(start, end, ratio)
+        colors.append(color.Color(c.r, c.g, c.b, start_alpha + (end_alpha - start_alpha) * ratio))
+    return tuple(colors)
+
+# Body gradients, indexed by segments.gradient_slot()
+SNAKE_GRADIENT = gradient(SNAKE_HEAD_COLOR, SNAKE_COLOR)
+AI_GRADIENT = gradient(AI_COLOR, AI_COLOR, 1.0, 0.2)
@@ -0,0 +1,43 @@
+"""
+Recycling of scene nodes.
+
+Games, restarts and menu previews create and throw away the same kinds of
+entities over and over. A pool keeps released objects disabled and hands
+them out again instead of building new ones.
+"""
+
+
+class EntityPool:
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self):
+        """A released object (enabled again), or a new one from the factory."""
+        if self.free:
+            obj = self.free.pop()
+            obj.enabled = True
+            self.reused += 1
+            return obj
+        self.created += 1
+        return self.factory()
+
+    def release(self, obj):
+        obj.enabled = False
+        self.free.append(obj)
+
+
+_pools = {}
+
+def get_pool(key, factory):
+    """The pool for `key`, created with `factory` on first use."""
+    if key not in _pools:
+        _pools[key] = EntityPool(factory)
+    return _pools[key]
+
+
+def stats():
+    """{key: (created, reused, free)} for every pool."""
+    return {key: (p.created, p.reused, len(p.free)) for key, p in _pools.items()}
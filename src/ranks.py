@@ -0,0 +1,70 @@
+"""
+Rank and percentile of a score among every game played in a mode.
+
+A Fenwick tree over score buckets (one bucket per integer score) answers
+"how many games scored more than x" in O(log max_score), and a finished
+game is added in O(log max_score).
+"""
+
+
+class ScoreRanks:
+    def __init__(self, counts=None):
+        """`counts` is an optional {score: number of games}."""
+        self.size = 64
+        self.tree = [0] * (self.size + 1)
+        self.total = 0
+        if counts:
+            self._grow(max(counts))
+            for score, count in counts.items():
+                self.add(score, count)
+
+    def _grow(self, score):
+        if score < self.size:
+            return
+        counts = [self.count_at(s) for s in range(self.size)]
+        while self.size <= score:
+            self.size *= 2
+        self.tree = [0] * (self.size + 1)
+        total = self.total
+        for s, count in enumerate(counts):
+            if count: self._update(s, count)
+        self.total = total
+
+    def _update(self, score, count):
+        i = score + 1
+        while i <= self.size:
+            self.tree[i] += count
+            i += i & -i
+
+    def _prefix(self, score):
+        """Games with a score <= `score`."""
+        i = min(score, self.size - 1) + 1
+        result = 0
+        while i > 0:
+            result += self.tree[i]
+            i -= i & -i
+        return result
+
+    def count_at(self, score):
+        return self._prefix(score) - (self._prefix(score - 1) if score > 0 else 0)
+
+    def add(self, score, count=1):
+        score = max(0, int(score))
+        self._grow(score)
+        self._update(score, count)
+        self.total += count
+
+    def count_above(self, score):
+        if score < 0:
+            return self.total
+        return self.total - self._prefix(int(score))
+
+    def rank(self, score):
+        """1 + number of games that scored strictly more."""
+        return self.count_above(score) + 1
+
+    def top_percent(self, score):
+        """'Top x%' of `score`, e.g. 8.0 when 8% of games scored at least as much."""
+        if self.total == 0:
+            return 100.0
+        return min(100.0, 100.0 * self.rank(score) / self.total)
@@ -0,0 +1,126 @@
+"""
+Frame scheduler.
+
+Ursina calls update() on every entity every frame, whether it has anything
+to do or not. Game systems register here instead: each frame the scheduler
+runs the active ones, lowest `order` first, and times them. An inactive
+system is not in the run list at all, so it costs nothing.
+
+    scheduler.add('camera', camera_controller.update, scheduler.CAMERA)
+    scheduler.set_active('camera', False)
+
+stats() reports the time spent in every system.
+
+listen() hooks window events (resize, focus) for systems that wake up on them.
+"""
+
+import time
+from direct.showbase.DirectObject import DirectObject
+from ursina import application
+
+# Run order: the simulation first, then what follows it
+GAME = 10
+INTERPOLATION = 15
+CAMERA = 20
+CHUNKS = 30
+CULLING = 40
+UI = 50
+PACING = 60
+
+
+class System:
+    def __init__(self, name, func, order):
+        self.name = name
+        self.func = func
+        self.order = order
+        self.active = False
+        self.calls = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+
+
+_systems = {}
+_running = () # Active systems in run order
+_task = None
+_events = None    # DirectObject listening to the events below
+_listeners = {}   # event name -> functions
+
+
+def add(name, func, order, active=True):
+    """Registers func() to run every frame as `name` (replaces a system of the same name)."""
+    if name in _systems:
+        _systems[name].active = False
+    system = System(name, func, order)
+    system.active = active
+    _systems[name] = system
+    _sort()
+    _start()
+    return system
+
+
+def remove(name):
+    system = _systems.pop(name, None)
+    if system:
+        system.active = False
+        _sort()
+
+
+def set_active(name, active):
+    system = _systems[name]
+    if system.active != active:
+        system.active = active
+        _sort()
+
+
+def is_active(name):
+    return name in _systems and _systems[name].active
+
+
+def _sort():
+    global _running
+    _running = tuple(sorted((s for s in _systems.values() if s.active), key=lambda s: s.order))
+
+
+def _start():
+    global _task
+    if _task is None:
+        # Added after Ursina's own update task, so time.dt is already set
+        _task = application.base.taskMgr.add(_run, 'frame_scheduler')
+
+
+def _run(task):
+    # A system may (de)activate others: the ones stopped this frame are skipped,
+    # the ones started run from the next frame
+    for system in _running:
+        if not system.active: continue
+        start = time.perf_counter()
+        system.func()
+        system.last_time = time.perf_counter() - start
+        system.total_time += system.last_time
+        system.calls += 1
+    return task.cont
+
+
+def stats():
+    """{system name: (active, calls, mean ms, last ms)} in run order."""
+    return {
+        s.name: (s.active, s.calls, s.total_time / s.calls * 1000 if s.calls else 0.0, s.last_time * 1000)
+        for s in sorted(_systems.values(), key=lambda s: s.order)
+    }
+
+
+def listen(event, func):
+    """Calls func(*args) on every Panda3D `event` ('window-event', 'aspectRatioChanged', ...)."""
+    global _events
+    if _events is None:
+        # Own listener: ShowBase.accept() would replace Ursina's handler of the same event
+        _events = DirectObject()
+    if event not in _listeners:
+        _listeners[event] = []
+        _events.accept(event, _dispatch, [event])
+    _listeners[event].append(func)
+
+
+def _dispatch(event, *args):
+    for func in list(_listeners[event]):
+        func(*args)
@@ -0,0 +1,368 @@
+"""
+Snake body rendering.
+
+InstancedSegments draws a whole body as one instanced geometry. The
+placement (position + scale) and color of every segment live in a float
+buffer texture read by the vertex shader, so the draw call count doesn't
+depend on the snake length. Instance i is body segment i:
+- a move shifts the placements by one (one memmove) and writes the new head,
+- colors only depend on the index and the length, so they are rewritten
+  when the snake grows, not when it moves,
+- the placements before the last move are kept too, and the shader draws
+  each segment between its previous and current placement (see
+  interpolation.py), so the body slides from cell to cell instead of jumping.
+
+EntitySegments is the fallback for drivers without GLSL instancing (one
+entity per segment). Use create_segments() to get whichever fits.
+
+Both recycle their nodes through pool.py: segment entities and instanced
+nodes (with their buffer) released by destroy() are handed to the next snake.
+"""
+
+import builtins
+from array import array
+
+from panda3d.core import Texture, GeomEnums, OmniBoundingVolume, TransparencyAttrib, LODNode
+from ursina import Entity, Shader, Vec2, Vec3, lerp
+import config
+from pool import get_pool
+from lod import lod_model
+
+# ==========================================
+# 1. Colors
+# ==========================================
+
+def gradient_slot(i, count, steps):
+    """Palette slot of segment i of count: round(i / (count - 1) * (steps - 1))."""
+    if count <= 1: return 0
+    steps -= 1
+    return (2 * i * steps + count - 1) // (2 * (count - 1))
+
+
+class GradientColoring:
+    """
+    Colors segment entities along a precomputed palette (see palette.gradient).
+    An entity is only recolored when its slot changes. When the tail entity
+    moves to the front, the others shift by one and only the few that cross
+    into the next slot change color, so a move costs O(steps), not O(length).
+    """
+    def __init__(self, palette, first=0):
+        self.palette = palette
+        self.first = first # Entities before this index are not colored (hidden head)
+        self.slots = []    # Current slot of each entity, None if not colored yet
+        self.count = None
+        self.boundaries = () # Indices whose slot differs from the previous one
+
+    def _slot(self, i, count):
+        return gradient_slot(i, count, len(self.palette))
+
+    def _set_count(self, count):
+        if count != self.count:
+            self.count = count
+            self.boundaries = tuple(i for i in range(1, count) if self._slot(i, count) != self._slot(i - 1, count))
+
+    def _apply(self, entities, index):
+        slot = self._slot(index - self.first, self.count)
+        if self.slots[index] != slot:
+            self.slots[index] = slot
+            entities[index].color = self.palette[slot]
+
+    def refresh(self, entities):
+        """Checks every entity (after growing or reversing)."""
+        self.slots.extend([None] * (len(entities) - len(self.slots)))
+        self._set_count(len(entities) - self.first)
+        for index in range(self.first, len(entities)):
+            self._apply(entities, index)
+
+    def moved_to_front(self, entities):
+        """Call after the last entity was moved to index 0."""
+        self.slots.insert(0, self.slots.pop())
+        self._set_count(len(entities) - self.first)
+        if self.count <= 0: return
+        self._apply(entities, self.first)
+        for index in self.boundaries:
+            self._apply(entities, self.first + index)
+
+    def reversed(self):
+        self.slots.reverse()
+
+# ==========================================
+# 2. One Entity Per Segment
+# ==========================================
+
+class EntitySegments:
+    """
+    One entity per body segment. Segments before `first` are hidden (the
+    player's head segment is drawn by the head model instead).
+    """
+    def __init__(self, model, scale, palette, positions, first=0):
+        self.pool = get_pool(('segment', model, scale), lambda: Entity(model=lod_model(model, scale), collider=None))
+        self.scale = scale
+        self.first = first
+        self.entities = [self._new_entity(position) for position in positions]
+        # Segment positions before and after the last move, blended by interpolate()
+        self.previous = [Vec3(*p) for p in positions]
+        self.current = list(self.previous)
+        self.alpha = 1.0
+        self.gradient = GradientColoring(palette, first)
+        self._refresh()
+
+    def _new_entity(self, position):
+        entity = self.pool.acquire()
+        entity.scale = self.scale
+        entity.position = position
+        return entity
+
+    def _refresh(self):
+        for i, entity in enumerate(self.entities):
+            entity.enabled = i >= self.first
+        self.gradient.refresh(self.entities)
+
+    @property
+    def count(self):
+        return len(self.entities)
+
+    def on_move(self, head_position):
+        entity = self.entities.pop()
+        entity.position = head_position
+        self.entities.insert(0, entity)
+        if self.first:
+            entity.enabled = False
+            if len(self.entities) > self.first: self.entities[self.first].enabled = True
+        self.gradient.moved_to_front(self.entities)
+        self.previous = self.current
+        self.current = [Vec3(*head_position)] + self.current[:-1]
+        self.interpolate(0.0)
+
+    def on_grow(self, position):
+        self.entities.append(self._new_entity(position))
+        self.previous.append(Vec3(*position))
+        self.current.append(Vec3(*position))
+        self._refresh()
+
+    def on_reverse(self, positions):
+        self.entities.reverse()
+        self.gradient.reversed()
+        self.previous = [Vec3(*p) for p in positions]
+        self.current = list(self.previous)
+        self.interpolate(1.0)
+        self._refresh()
+
+    def interpolate(self, alpha):
+        """Places the segments `alpha` of the way from their previous to their current cell."""
+        if alpha == self.alpha == 1.0: return
+        self.alpha = alpha
+        for i in range(self.first, len(self.entities)):
+            self.entities[i].position = lerp(self.previous[i], self.current[i], alpha)
+
+    def destroy(self):
+        for entity in self.entities: self.pool.release(entity)
+        self.entities = []
+
+# ==========================================
+# 3. Instanced
+# ==========================================
+
+# Buffer layout: `capacity` placement texels (x, y, z, scale), then
+# `capacity` color texels (r, g, b, a), then `capacity` placement texels
+# from before the last move. instance_layout = (capacity, first), and
+# instance_interp blends the previous placements (0) into the current ones (1).
+segment_shader = Shader(name='segment_shader', language=Shader.GLSL, vertex='''#version 140
+
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform samplerBuffer instance_data;
+uniform vec2 instance_layout;
+uniform float instance_interp;
+in vec4 p3d_Vertex;
+in vec4 p3d_Color;
+in vec2 p3d_MultiTexCoord0;
+out vec2 texcoords;
+out vec4 vertex_color;
+
+void main() {
+    int index = gl_InstanceID + int(instance_layout.y);
+    int capacity = int(instance_layout.x);
+    vec4 placement = mix(texelFetch(instance_data, 2 * capacity + index), texelFetch(instance_data, index), instance_interp);
+    vec4 instance_color = texelFetch(instance_data, int(instance_layout.x) + index);
+    gl_Position = p3d_ModelViewProjectionMatrix * vec4(p3d_Vertex.xyz * placement.w + placement.xyz, 1.0);
+    texcoords = p3d_MultiTexCoord0;
+    vertex_color = p3d_Color * instance_color;
+}
+''',
+fragment='''#version 140
+
+uniform sampler2D p3d_Texture0;
+uniform vec4 p3d_ColorScale;
+in vec2 texcoords;
+in vec4 vertex_color;
+out vec4 fragColor;
+
+void main() {
+    fragColor = texture(p3d_Texture0, texcoords) * p3d_ColorScale * vertex_color;
+}
+''')
+
+
+def instancing_supported():
+    win = getattr(builtins, 'base', None) and builtins.base.win
+    gsg = win and win.getGsg()
+    return bool(gsg and gsg.getSupportsGlsl() and gsg.getSupportsBufferTexture() and gsg.getSupportsGeometryInstancing())
+
+
+class InstancedSegments:
+    """
+    Same interface as EntitySegments, drawn as a single instanced node.
+    Build one with create_segments(); setup() gives a pooled one a new body.
+    """
+    def __init__(self, model, capacity=64):
+        self.model = model
+        self.scale = 1
+        self.palette = ()
+        self.first = 0
+        self.count = 0
+        self.capacity = 0
+        self.buffer = None
+        self.alpha = 1.0
+
+        self.entity = Entity(model=lod_model(model), collider=None)
+        self.entity.shader = segment_shader
+        self.entity.setShaderInput('instance_interp', self.alpha)
+        # The level of detail follows the head's distance (the node itself sits at the origin)
+        lod = self.entity.model.node()
+        self.lod = lod if isinstance(lod, LODNode) else None
+        # Instances are placed by the shader, so the model's own bounds mean nothing
+        self.entity.node().setBounds(OmniBoundingVolume())
+        self.entity.node().setFinal(True)
+        self._reserve(capacity)
+
+    def setup(self, scale, palette, positions, first=0):
+        self.scale = scale
+        self.palette = palette
+        self.first = first
+        if any(c.a < 1 for c in palette):
+            self.entity.setTransparency(TransparencyAttrib.M_alpha)
+        else:
+            self.entity.clearTransparency()
+        self.set_positions(positions)
+
+    @property
+    def enabled(self):
+        return self.entity.enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        self.entity.enabled = value
+
+    # --- Buffer ---
+
+    def _floats(self):
+        """Float view of the buffer; also marks it for re-upload."""
+        return memoryview(self.buffer.modifyRamImage()).cast('B').cast('f')
+
+    def _reserve(self, count):
+        if count <= self.capacity:
+            return
+        old_buffer, old_capacity = self.buffer, self.capacity
+        capacity = max(self.capacity, 16)
+        while capacity < count:
+            capacity *= 2
+
+        self.buffer = Texture('segment_instances')
+        self.buffer.setupBufferTexture(3 * capacity, Texture.T_float, Texture.F_rgba32, GeomEnums.UH_dynamic)
+        self.capacity = capacity
+        if old_buffer is not None:
+            old = memoryview(old_buffer.getRamImage()).cast('B').cast('f')
+            new = self._floats()
+            for block in range(3):
+                new[4 * block * capacity:4 * (block * capacity + old_capacity)] = old[4 * block * old_capacity:4 * (block + 1) * old_capacity]
+        self.entity.setShaderInput('instance_data', self.buffer)
+        self._update_layout()
+
+    def _update_layout(self):
+        self.entity.setShaderInput('instance_layout', Vec2(self.capacity, self.first))
+        self.entity.setInstanceCount(max(0, self.count - self.first))
+
+    def _write_colors(self):
+        floats = self._floats()
+        base = 4 * self.capacity
+        visible = self.count - self.first
+        for i in range(self.first, self.count):
+            c = self.palette[gradient_slot(i - self.first, visible, len(self.palette))]
+            floats[base + 4 * i:base + 4 * i + 4] = array('f', (c.r, c.g, c.b, c.a))
+
+    # --- Inspection (offscreen checks) ---
+
+    def placement(self, i):
+        """(x, y, z, scale) stored for segment i."""
+        return tuple(self._floats()[4 * i:4 * i + 4])
+
+    def previous_placement(self, i):
+        """(x, y, z, scale) of segment i before the last move."""
+        base = 8 * self.capacity
+        return tuple(self._floats()[base + 4 * i:base + 4 * i + 4])
+
+    def color(self, i):
+        """(r, g, b, a) stored for segment i."""
+        base = 4 * (self.capacity + i)
+        return tuple(self._floats()[base:base + 4])
+
+    # --- Segments ---
+
+    def set_positions(self, positions):
+        """Places the segments at `positions` right away (no blend from the previous ones)."""
+        self.count = len(positions)
+        self._reserve(self.count)
+        floats = self._floats()
+        for i, p in enumerate(positions):
+            floats[4 * i:4 * i + 4] = array('f', (p[0], p[1], p[2], self.scale))
+        base = 8 * self.capacity
+        floats[base:base + 4 * self.count] = floats[0:4 * self.count]
+        if self.lod and positions: self.lod.setCenter(positions[0])
+        self._write_colors()
+        self._update_layout()
+        self.interpolate(1.0)
+
+    def on_move(self, head_position):
+        floats = self._floats()
+        # The current placements become the previous ones
+        base = 8 * self.capacity
+        floats[base:base + 4 * self.count] = floats[0:4 * self.count]
+        # Everyone takes the place of the segment in front of it
+        floats[4:4 * self.count] = floats[0:4 * (self.count - 1)]
+        floats[0:4] = array('f', (head_position[0], head_position[1], head_position[2], self.scale))
+        if self.lod: self.lod.setCenter(head_position)
+        self.interpolate(0.0)
+
+    def on_grow(self, position):
+        self.count += 1
+        self._reserve(self.count)
+        i = self.count - 1
+        placement = array('f', (position[0], position[1], position[2], self.scale))
+        floats = self._floats()
+        floats[4 * i:4 * i + 4] = placement
+        floats[8 * self.capacity + 4 * i:8 * self.capacity + 4 * i + 4] = placement
+        self._write_colors()
+        self._update_layout()
+
+    def interpolate(self, alpha):
+        """Draws the segments `alpha` of the way from their previous to their current placement."""
+        if alpha != self.alpha:
+            self.alpha = alpha
+            self.entity.setShaderInput('instance_interp', alpha)
+
+    def on_reverse(self, positions):
+        self.set_positions(positions)
+
+    def destroy(self):
+        # The node and its buffer are kept for the next snake
+        self.count = 0
+        self._update_layout()
+        get_pool(('instanced', self.model), None).release(self)
+
+
+def create_segments(model, scale, palette, positions, first=0):
+    if config.INSTANCED_SEGMENTS and instancing_supported():
+        segments = get_pool(('instanced', model), lambda: InstancedSegments(model)).acquire()
+        segments.setup(scale, palette, positions, first)
+        return segments
+    return EntitySegments(model, scale, palette, positions, first)
@@ -0,0 +1,223 @@
+"""
+Audio helpers.
+Background music is streamed from disk instead of being decoded up front,
+short sound effects are preloaded into a small bank of voices.
+GameAudio ties both together and resumes the music if its stream stops.
+"""
+
+import time
+from panda3d.core import AudioManager, AudioSound, Filename
+from ursina import application, Audio
+
+# Compressed tracks are preferred: they are decoded chunk by chunk while playing.
+MUSIC_FORMATS = ('.ogg', '.wav')
+
+
+def find_audio_file(file_name, formats=None):
+    """
+    Looks up an audio file in the asset folder (same search as ursina's Audio).
+    If `formats` is given, the extension of `file_name` is ignored and each
+    format is tried in order. Returns a panda3d Filename or None.
+    """
+    stem = file_name
+    if formats is None:
+        formats = ('',)
+    elif '.' in file_name:
+        stem = file_name.rsplit('.', 1)[0]
+
+    for suffix in formats:
+        for f in application.asset_folder.glob(f'**/{stem}{suffix}'):
+            return Filename.fromOsSpecific(str(f.resolve()))
+    return None
+
+
+class StreamingMusic:
+    """
+    Looping music track played in streaming mode.
+    The file is only opened on the first play(), so nothing is decoded at startup.
+    A missing file is looked up once; play() does nothing after that.
+    Exposes the same play/stop/playing/volume surface as ursina's Audio.
+    """
+    def __init__(self, file_name, volume=1.0, loop=True):
+        self.file_name = file_name
+        self.loop = loop
+        self._volume = volume
+        self._clip = None
+        self.missing = False
+
+    @property
+    def clip(self):
+        if self._clip is None:
+            if self.missing: return None
+            path = find_audio_file(self.file_name, MUSIC_FORMATS)
+            if path is None:
+                print('no music found with name:', self.file_name)
+                self.missing = True
+                return None
+            manager = application.base.musicManager
+            self._clip = manager.getSound(path, False, AudioManager.SM_stream)
+            self._clip.setLoop(self.loop)
+            self._clip.setVolume(self._volume * Audio.volume_multiplier)
+        return self._clip
+
+    @property
+    def volume(self):
+        return self._volume
+
+    @volume.setter
+    def volume(self, value):
+        self._volume = value
+        if self._clip is not None:
+            self._clip.setVolume(value * Audio.volume_multiplier)
+
+    @property
+    def playing(self):
+        return self._clip is not None and self._clip.status() == AudioSound.PLAYING
+
+    @property
+    def time(self):
+        """Playback position in seconds (0 before the first play)."""
+        return self._clip.getTime() if self._clip is not None else 0.0
+
+    def play(self, start_time=0.0):
+        if self.clip:
+            self.clip.setTime(start_time)
+            self.clip.play()
+
+    def stop(self):
+        if self._clip is not None:
+            self._clip.stop()
+
+
+class SoundBank:
+    """
+    Short sound effects fully loaded into memory, `voices` copies per sound.
+    Playing picks the next idle voice so overlapping plays don't cut each other off.
+    """
+    def __init__(self, voices=2):
+        self.voices = voices
+        self.sounds = {}
+        self._next = {}
+
+    def load(self, key, file_name, volume=1.0):
+        path = find_audio_file(file_name)
+        if path is None:
+            print('no audio found with name:', file_name)
+            return
+        manager = application.base.sfxManagerList[0]
+        voices = []
+        for _ in range(self.voices):
+            clip = manager.getSound(path, False, AudioManager.SM_sample)
+            clip.setVolume(volume * Audio.volume_multiplier)
+            voices.append(clip)
+        self.sounds[key] = voices
+        self._next[key] = 0
+
+    @property
+    def voice_count(self):
+        return sum(len(voices) for voices in self.sounds.values())
+
+    def play(self, key):
+        """Plays a voice for `key`. Returns False if a busy voice had to be restarted."""
+        voices = self.sounds.get(key)
+        if not voices: return True
+
+        index = self._next[key]
+        idle = False
+        # Prefer an idle voice, otherwise restart the oldest one
+        for offset in range(len(voices)):
+            candidate = (index + offset) % len(voices)
+            if voices[candidate].status() != AudioSound.PLAYING:
+                index = candidate
+                idle = True
+                break
+        self._next[key] = (index + 1) % len(voices)
+        voices[index].play()
+        return idle
+
+
+class GameAudio:
+    """
+    Owns the music track and the effect voices.
+
+    Instead of polling the music every frame, a watchdog task checks it once
+    per WATCHDOG_INTERVAL: if the music should be playing but its stream has
+    stopped (device lost, decoder error), it is restarted where it was last
+    seen playing. After MAX_FAILED_RESTARTS restarts in a row that didn't
+    get it playing (no audio device, broken file) it gives up until the next
+    play_music(). stats() counts the restarts, voice steals and the time
+    spent in the play() calls (Python side, not the audio output latency).
+    """
+    WATCHDOG_INTERVAL = 1.0
+    MAX_FAILED_RESTARTS = 3
+
+    def __init__(self, music_file, music_volume=0.5, voices=2):
+        self.music = StreamingMusic(music_file, volume=music_volume, loop=True)
+        self.sfx = SoundBank(voices=voices)
+        self.music_wanted = False
+        self.music_time = 0.0 # Music position at the last watchdog check
+
+        # Counters
+        self.plays = 0
+        self.voice_steals = 0
+        self.music_restarts = 0
+        self.failed_restarts = 0 # Restarts in a row that didn't take
+        self.last_play_call_ms = 0.0
+        self.max_play_call_ms = 0.0
+
+        self._task = None
+
+    def load_sfx(self, sounds):
+        """`sounds` maps a key to a file name, e.g. {'eat': 'eat apple.wav'}."""
+        for key, file_name in sounds.items():
+            self.sfx.load(key, file_name)
+        application.base.sfxManagerList[0].setConcurrentSoundLimit(self.sfx.voice_count)
+
+    def start(self):
+        """Starts the watchdog task. Call once after the window exists."""
+        if self._task is None:
+            self._task = application.base.taskMgr.doMethodLater(
+                self.WATCHDOG_INTERVAL, self._watchdog, 'game_audio_watchdog')
+
+    def play(self, key):
+        start = time.perf_counter()
+        if not self.sfx.play(key):
+            self.voice_steals += 1
+        self.plays += 1
+        self.last_play_call_ms = (time.perf_counter() - start) * 1000
+        self.max_play_call_ms = max(self.max_play_call_ms, self.last_play_call_ms)
+
+    def play_music(self):
+        self.music_wanted = True
+        self.failed_restarts = 0
+        if not self.music.playing:
+            self.music_time = 0.0
+            self.music.play()
+
+    def stop_music(self):
+        self.music_wanted = False
+        self.music.stop()
+
+    def _watchdog(self, task):
+        if self.music_wanted and not self.music.missing:
+            if self.music.playing:
+                self.music_time = self.music.time
+                self.failed_restarts = 0
+            elif self.failed_restarts < self.MAX_FAILED_RESTARTS:
+                self.music_restarts += 1
+                self.failed_restarts += 1
+                self.music.play(self.music_time)
+            elif self.failed_restarts == self.MAX_FAILED_RESTARTS:
+                print(f"Music stream doesn't restart, giving up after {self.failed_restarts} tries")
+                self.failed_restarts += 1
+        return task.again
+
+    def stats(self):
+        return {
+            'plays': self.plays,
+            'voice_steals': self.voice_steals,
+            'music_restarts': self.music_restarts,
+            'music_given_up': self.failed_restarts > self.MAX_FAILED_RESTARTS,
+            'last_play_call_ms': round(self.last_play_call_ms, 3),
+            'max_play_call_ms': round(self.max_play_call_ms, 3),
+        }
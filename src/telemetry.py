@@ -0,0 +1,271 @@
+"""
+Per-game telemetry, stored column by column.
+
+Every finished game is one row. Rows are appended to segments of
+SEGMENT_ROWS rows. Each segment is a folder with one raw little-endian array
+file per column, so a query only reads the columns it needs, straight into
+a stdlib `array`. Text columns (mode, camera, ...) are stored as small
+integer codes and the code -> text table is kept in dictionary.json.
+
+The game hands finished rows to queue_append(), which writes them from a
+background thread (like the leaderboard), so game over doesn't wait on disk.
+
+    python src/telemetry.py summary [--last 100000] [--by mode] [--folder telemetry]
+    python src/telemetry.py export games.csv [--last N]
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from array import array
+
+FOLDER = 'telemetry'
+SEGMENT_ROWS = 65536
+
+# name -> array typecode. Text columns use 'B' and the dictionary.
+COLUMNS = {
+    'played_at': 'd',          # Unix time at game over
+    'mode': 'B',
+    'grid_size': 'H',
+    'cam_mode': 'B',
+    'ai_mode': 'B',            # 'none', 'normal' or 'aggressive'
+    'ticks': 'I',              # Snake moves
+    'food_eaten': 'I',
+    'survival': 'f',           # Seconds
+    'mean_food_interval': 'f', # Seconds between foods (0 if none eaten)
+    'max_food_interval': 'f',
+    'death': 'B',              # check_highscore_and_end message
+}
+TEXT_COLUMNS = ('mode', 'cam_mode', 'ai_mode', 'death')
+
+
+class GameStats:
+    """Collects the stats of the game being played."""
+
+    def __init__(self, mode, grid_size, cam_mode, ai_mode):
+        self.mode = mode
+        self.grid_size = grid_size
+        self.cam_mode = cam_mode
+        self.ai_mode = ai_mode
+        self.ticks = 0
+        self.start_time = time.time()
+        self.food_times = []
+
+    def tick(self):
+        self.ticks += 1
+
+    def food(self):
+        self.food_times.append(time.time())
+
+    def finish(self, death):
+        """Returns the row of the finished game."""
+        now = time.time()
+        times = [self.start_time] + self.food_times
+        intervals = [b - a for a, b in zip(times, times[1:])]
+        return {
+            'played_at': now,
+            'mode': self.mode,
+            'grid_size': self.grid_size,
+            'cam_mode': self.cam_mode,
+            'ai_mode': self.ai_mode,
+            'ticks': self.ticks,
+            'food_eaten': len(self.food_times),
+            'survival': now - self.start_time,
+            'mean_food_interval': sum(intervals) / len(intervals) if intervals else 0.0,
+            'max_food_interval': max(intervals) if intervals else 0.0,
+            'death': death,
+        }
+
+
+class TelemetryStore:
+    def __init__(self, folder=FOLDER):
+        self.folder = folder
+        self.dictionary_file = os.path.join(folder, 'dictionary.json')
+        self.dictionary = {name: [] for name in TEXT_COLUMNS}
+        if os.path.exists(self.dictionary_file):
+            with open(self.dictionary_file, 'r') as f:
+                self.dictionary.update(json.load(f))
+
+        # Background writer (see queue_append)
+        self._write_lock = threading.Condition()
+        self._pending = [] # Rows not written yet
+        self._writing = False
+        self._writer = None
+
+    # --- Segments ---
+
+    def segments(self):
+        if not os.path.isdir(self.folder):
+            return []
+        return sorted(os.path.join(self.folder, name) for name in os.listdir(self.folder) if name.startswith('seg_'))
+
+    def _column_file(self, segment, name):
+        return os.path.join(segment, name + '.bin')
+
+    def segment_rows(self, segment):
+        # A crash can leave columns of different lengths; only whole rows count
+        rows = []
+        for name, typecode in COLUMNS.items():
+            try:
+                rows.append(os.path.getsize(self._column_file(segment, name)) // array(typecode).itemsize)
+            except OSError:
+                rows.append(0)
+        return min(rows)
+
+    # --- Writing ---
+
+    def _code(self, column, value):
+        values = self.dictionary[column]
+        value = str(value)
+        if value not in values:
+            values.append(value)
+            tmp_file = self.dictionary_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(self.dictionary, f)
+            os.replace(tmp_file, self.dictionary_file)
+        return values.index(value)
+
+    def append(self, row):
+        os.makedirs(self.folder, exist_ok=True)
+        segments = self.segments()
+        if not segments or self.segment_rows(segments[-1]) >= SEGMENT_ROWS:
+            segment = os.path.join(self.folder, f'seg_{len(segments):06d}')
+            os.makedirs(segment, exist_ok=True)
+        else:
+            segment = segments[-1]
+        rows = self.segment_rows(segment)
+
+        for name, typecode in COLUMNS.items():
+            value = self._code(name, row[name]) if name in TEXT_COLUMNS else row[name]
+            column = array(typecode, [value])
+            if sys.byteorder == 'big': column.byteswap()
+            with open(self._column_file(segment, name), 'a+b') as f:
+                # Drop a partial row left by a crash so the columns stay aligned
+                f.truncate(rows * column.itemsize)
+                column.tofile(f)
+
+    def queue_append(self, row):
+        """append(row) from the writer thread. See flush()."""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name='telemetry-writer', daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+            self._pending.append(row)
+            self._write_lock.notify_all()
+
+    def _writer_loop(self):
+        while True:
+            with self._write_lock:
+                while not self._pending:
+                    self._write_lock.wait()
+                rows = self._pending
+                self._pending = []
+                self._writing = True
+
+            for row in rows:
+                try:
+                    self.append(row)
+                except Exception as e:
+                    print(f"Error saving telemetry: {e}")
+
+            with self._write_lock:
+                self._writing = False
+                self._write_lock.notify_all()
+
+    def flush(self, timeout=5.0):
+        """Blocks until queued rows are on disk. Returns False on timeout."""
+        with self._write_lock:
+            return self._write_lock.wait_for(lambda: not (self._pending or self._writing), timeout)
+
+    # --- Reading ---
+
+    def read(self, columns, last=None):
+        """
+        Returns {column: array} for the `last` games (all if None), oldest
+        first. Text columns stay as codes, see decode().
+        """
+        parts = {name: [] for name in columns} # Newest segment first
+        remaining = last
+        for segment in reversed(self.segments()):
+            rows = self.segment_rows(segment)
+            skip = 0
+            if remaining is not None:
+                skip = max(0, rows - remaining)
+                remaining -= rows - skip
+            for name in columns:
+                column = array(COLUMNS[name])
+                with open(self._column_file(segment, name), 'rb') as f:
+                    f.seek(skip * column.itemsize)
+                    column.fromfile(f, rows - skip)
+                if sys.byteorder == 'big': column.byteswap()
+                parts[name].append(column)
+            if remaining is not None and remaining <= 0:
+                break
+
+        result = {}
+        for name in columns:
+            result[name] = array(COLUMNS[name])
+            for column in reversed(parts[name]):
+                result[name].extend(column)
+        return result
+
+    def decode(self, column, code):
+        return self.dictionary[column][code]
+
+
+# --- CLI ---
+
+def summary(store, last=None, by='mode'):
+    metrics = ('survival', 'ticks', 'food_eaten', 'mean_food_interval')
+    data = store.read((by,) + metrics, last)
+    groups = {}
+    for i, key in enumerate(data[by]):
+        group = groups.setdefault(key, [0] + [0.0] * len(metrics))
+        group[0] += 1
+        for j, name in enumerate(metrics):
+            group[j + 1] += data[name][i]
+
+    print(f"{by:<16}{'games':>9}" + ''.join(f'{name:>20}' for name in metrics))
+    for key, group in sorted(groups.items(), key=lambda item: -item[1][0]):
+        label = store.decode(by, key) if by in TEXT_COLUMNS else str(key)
+        print(f'{label:<16}{group[0]:>9}' + ''.join(f'{total / group[0]:>20.2f}' for total in group[1:]))
+
+
+def export_csv(store, path, last=None):
+    import csv
+    data = store.read(tuple(COLUMNS), last)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for i in range(len(data['played_at'])):
+            writer.writerow([store.decode(name, data[name][i]) if name in TEXT_COLUMNS else data[name][i] for name in COLUMNS])
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Game telemetry queries")
+    parser.add_argument('--folder', default=FOLDER)
+    commands = parser.add_subparsers(dest='command', required=True)
+    summary_parser = commands.add_parser('summary', help="Mean stats per group")
+    summary_parser.add_argument('--last', type=int)
+    summary_parser.add_argument('--by', default='mode', choices=list(TEXT_COLUMNS) + ['grid_size'])
+    export_parser = commands.add_parser('export', help="Write the games to a CSV file")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--last', type=int)
+    args = parser.parse_args()
+
+    store = TelemetryStore(args.folder)
+    start = time.perf_counter()
+    if args.command == 'summary':
+        summary(store, args.last, args.by)
+    else:
+        export_csv(store, args.path, args.last)
+    print(f"({time.perf_counter() - start:.3f}s)")
+
+
+if __name__ == '__main__':
+    main()
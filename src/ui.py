@@ -4,12 +4,24 @@ from ursina import Ursina, Entity, Text, Button, camera, destroy, window, color,
 from ursina.prefabs.window_panel import WindowPanel
 import leaderboard
 import config
+import palette
+import fonts
+import layout
+from layout import set_text, set_color
 
 REGULAR_FONT = '../assets/MinecraftRegular-Bmg3.otf'
 BOLD_FONT = '../assets/MinecraftBold-nMK1.otf'
 ITALIC_FONT = '../assets/MinecraftItalic-R8Mo.otf'
 BOLDITALIC_FONT = '../assets/MinecraftBoldItalic-1y1e.otf'
 HIGH_SCORE_FILE = "highscore.txt"
+FONTS = (REGULAR_FONT, BOLD_FONT, ITALIC_FONT, BOLDITALIC_FONT, Text.default_font)
+
+def preload_fonts():
+    """
+    Loads the cached glyph atlas of every UI font (building it on first run),
+    so creating Text entities never has to rasterize glyphs.
+    """
+    fonts.preload(FONTS)
 
 def get_high_score():
     """
@@ -38,25 +50,26 @@ class GameHUD(Entity):
         self.margin = 0.025 # Distance from the edge
         
         # Current Score (Top Left)
-        # Position will be set in update()
+        # Position will be set in layout()
         self.score_text = Text(text='Score: 0', origin=(-0.5, 0.5), scale=1.5, color=color.white, font=REGULAR_FONT, parent=self)
         
         # High Score (Top Right)
         if player_name != "Guest":
-            scores = leaderboard.load_scores(current_mode)
-            for entry in scores:
-                if entry['name'] == player_name:
-                    self.high_score = entry['score']
-                    break
+            best = leaderboard.get_player_best(player_name, current_mode)
+            if best is not None:
+                self.high_score = best
             
             self.high_score_text = Text(text=f'High Score: {self.high_score}', origin=(0.5, 0.5), scale=1.5, color=color.white, font=REGULAR_FONT, parent=self)
         else:
             self.high_score_text = None
 
-        # Run one update immediately to set initial positions
-        self.update()
+        # Laid out now and on window resize
+        layout.add('hud', self.layout)
+
+    def on_destroy(self):
+        layout.remove('hud')
 
-    def update(self):
+    def layout(self):
         # Dynamically anchor to window corners
         # window.top_left is usually (-aspect_ratio/2, 0.5)
         
@@ -67,14 +80,14 @@ class GameHUD(Entity):
             self.high_score_text.position = (window.top_right.x - self.margin, window.top_right.y - self.margin)
 
     def update_score(self, current_score):
-        self.score_text.text = f'Score: {current_score}'
+        set_text(self.score_text, f'Score: {current_score}')
         
         if self.high_score_text:
             if current_score > self.high_score:
-                self.high_score_text.text = f'High Score: {current_score}'
-                self.high_score_text.color = color.yellow
+                set_text(self.high_score_text, f'High Score: {current_score}')
+                set_color(self.high_score_text, color.yellow)
             else:
-                self.high_score_text.color = color.white
+                set_color(self.high_score_text, color.white)
 
 class GameOverUI(Entity):
     def __init__(self, player_name, score, current_mode, restart_callback, menu_callback, **kwargs):
@@ -100,16 +113,20 @@ class GameOverUI(Entity):
         Text(text=f'Score: {score}', parent=self.panel, scale=2.3, position=(-0.2, -0.05), origin=(0,0), color=color.white, font=REGULAR_FONT)
 
         # Highscore (Fetch from leaderboard)
-        scores = leaderboard.load_scores(current_mode)
-        player_highscore = score # Default to current if not found
-        for entry in scores:
-            if entry['name'] == player_name:
-                player_highscore = entry['score']
-                break
+        player_highscore = leaderboard.get_player_best(player_name, current_mode)
+        if player_highscore is None:
+            player_highscore = score # Default to current if not found
         
         # High Score
         Text(text=f'High Score: {player_highscore}', parent=self.panel, scale=2.3, position=(0.2, -0.05), origin=(0,0), color=color.gold, font=REGULAR_FONT)
 
+        # Rank among every game played in this mode (backends with a game history only)
+        rank = leaderboard.get_rank(score, current_mode)
+        if rank:
+            position, top_percent = rank
+            percent = f'{top_percent:.0f}' if top_percent >= 1 else f'{top_percent:.1f}'
+            Text(text=f'Rank {position:,}  -  top {percent}%', parent=self.panel, scale=1.5, y=-0.115, origin=(0,0), color=color.light_gray, font=REGULAR_FONT)
+
         # Buttons (adjusted y position)
         # Restart
         self.btn_restart = Button(text='Restart', color=color.gray, text_color=color.white, scale=(0.3, 0.1), position=(-0.2, -0.20), highlight_text_color=color.green, parent=self.panel, font=ITALIC_FONT)
@@ -130,8 +147,8 @@ class GameOverUI(Entity):
         self.lb_margin = Vec3(0.03, 0.03, 0) # Margin from bottom left
         self.leaderboard_container = Entity(parent=self, z=-10) # Adjusted z for layering
         
-        # Explicit update to set initial position
-        self.update()
+        # Laid out now and on window resize
+        layout.add('game over', self.layout)
 
         Entity(parent=self.leaderboard_container, model='quad', scale=(0.3, 0.37), color=color.black50, origin=(-0.5, -0.5)) # Origin bottom-left for easier alignment
         
@@ -146,7 +163,7 @@ class GameOverUI(Entity):
         start_y = 0.265
         row_height = 0.025
         # Sort and limit scores just in case (though load_scores should handle it)
-        scores = sorted(scores, key=lambda x: x['score'], reverse=True)[:10]
+        scores = sorted(leaderboard.load_scores(current_mode), key=lambda x: x['score'], reverse=True)[:10]
 
         for i in range(10):
             y_pos = start_y - (i * row_height)
@@ -164,13 +181,35 @@ class GameOverUI(Entity):
             Text(text=name_txt, parent=self.leaderboard_container, scale=0.75, position=(0.03, y_pos), origin=(-0.5, 0.5), color=col, font=REGULAR_FONT)
             Text(text=score_txt, parent=self.leaderboard_container, scale=0.75, position=(0.23, y_pos), origin=(0, 0.5), color=col, font=REGULAR_FONT)
 
-    def update(self):
+    def on_destroy(self):
+        layout.remove('game over')
+
+    def layout(self):
         # Dynamically align to bottom left
         if self.leaderboard_container:
             self.leaderboard_container.position = window.bottom_left + self.lb_margin
 
 
 
+class LoadingScreen(Entity):
+    """Minimal first-frame screen shown while the startup stages load."""
+    def __init__(self, **kwargs):
+        super().__init__(parent=camera.ui, **kwargs)
+        self.bg = Entity(parent=self, model='quad', scale=(20, 10), color=color.black66, z=10)
+        self.title = Text(text='3D SNAKE', parent=self, scale=6, y=0.375, origin=(0,0), color=color.white, z=-1)
+
+        self.bar_width = 0.6
+        Entity(parent=self, model='quad', scale=(self.bar_width, 0.02), y=-0.3, color=color.black33)
+        self.bar = Entity(parent=self, model='quad', scale=(0.001, 0.02), position=(-self.bar_width / 2, -0.3), origin=(-0.5, 0), color=color.azure, z=-1)
+        self.status_text = Text(text='Loading...', parent=self, scale=1, y=-0.35, origin=(0,0), color=color.light_gray)
+
+    def on_progress(self, stage_name, done, total):
+        """StartupLoader listener."""
+        self.bar.scale_x = max(0.001, self.bar_width * done / max(total, 1))
+        if stage_name:
+            self.status_text.text = f'Loading... {stage_name} ({done}/{total})'
+
+
 class MainMenu(Entity):
     def __init__(self, start_game_callback, quit_callback, bg_music_track, world_grid=None, on_mode_changed_callback=None):
         super().__init__(parent=camera.ui)
@@ -184,7 +223,8 @@ class MainMenu(Entity):
         self.modes = [
             {'key': 'classic', 'name': 'Classic Mode', 'desc': 'Classic Snake: Eat and Grow', 'color': color.yellow},
             {'key': 'classic_large', 'name': 'Classic (Large)', 'desc': 'Larger Grid (10x10)', 'color': color.green},
-            {'key': 'obstacles', 'name': 'Obstacles', 'desc': 'Eat Food -> Spawns Obstacle', 'color': config.OBSTACLE_COLOR},
+            {'key': 'classic_huge', 'name': 'Classic (Huge)', 'desc': f'Huge Grid ({config.HUGE_GRID_SIZE}x{config.HUGE_GRID_SIZE})', 'color': color.lime},
+            {'key': 'obstacles', 'name': 'Obstacles', 'desc': 'Eat Food -> Spawns Obstacle', 'color': palette.OBSTACLE_COLOR},
             {'key': 'reverse', 'name': 'Reverse Mode', 'desc': 'Eat Food -> Body Reverses!', 'color': color.cyan},
             {'key': 'ai', 'name': 'Survival Mode (Easy)', 'desc': 'Avoid the AI Snake!', 'color': color.orange},
             {'key': 'ai_hard', 'name': 'Survival Mode (Hard)', 'desc': 'Hunter AI: Chases you!', 'color': color.red}
@@ -256,7 +296,7 @@ class MainMenu(Entity):
             self.lb_entries.append((t_name, t_score))
 
         # Player Name Input (Above Leaderboard)
-        # Position relative to leaderboard will be handled in update()
+        # Position relative to leaderboard will be handled in layout()
         self.name_label = Text(text='Currently playing as:', parent=self, scale=1, origin=(-0.5, 0), color=color.light_gray, font=REGULAR_FONT)
         
         # Position InputField to the right of the label
@@ -334,6 +374,9 @@ class MainMenu(Entity):
         self.update_settings_ui()
         self.update_mode_display()
 
+        # Laid out now and on window resize
+        layout.add('menu', self.layout)
+
     def set_camera_mode(self, mode):
         self.selected_cam_mode = mode
         self.update_settings_ui()
@@ -342,7 +385,7 @@ class MainMenu(Entity):
         # Trigger update
         self.update_mode_display()
 
-    def update(self):
+    def layout(self):
         # Dynamically align Leaderboard to bottom left
         if self.leaderboard_container:
             self.leaderboard_container.position = window.bottom_left + self.lb_margin
@@ -417,11 +460,11 @@ class MainMenu(Entity):
     def update_settings_ui(self):
         for key, ui in self.cam_toggles.items():
             if key == self.selected_cam_mode:
-                ui['indicator'].color = color.azure
-                ui['name'].color = color.azure
+                set_color(ui['indicator'], color.azure)
+                set_color(ui['name'], color.azure)
             else:
-                ui['indicator'].color = color.dark_gray
-                ui['name'].color = color.white
+                set_color(ui['indicator'], color.dark_gray)
+                set_color(ui['name'], color.white)
 
     def update_leaderboard(self):
         mode_key = self.modes[self.current_mode_index]['key']
@@ -436,29 +479,30 @@ class MainMenu(Entity):
         for i in range(10):
             t_name, t_score = self.lb_entries[i]
             
+            # Only rows that changed are rebuilt
             if i < len(scores):
                 entry = scores[i]
-                t_name.text = entry['name'][:10]
-                t_score.text = str(entry['score'])
+                set_text(t_name, entry['name'][:10])
+                set_text(t_score, str(entry['score']))
                 
                 # Highlight if name matches current input and is not Guest
                 if current_player != "Guest" and entry['name'] == current_player:
-                    t_name.color = color.azure
-                    t_score.color = color.azure
+                    set_color(t_name, color.azure)
+                    set_color(t_score, color.azure)
                 else:
-                    t_name.color = color.white
-                    t_score.color = color.white
+                    set_color(t_name, color.white)
+                    set_color(t_score, color.white)
             else:
-                t_name.text = "-"
-                t_score.text = "-"
-                t_name.color = color.white
-                t_score.color = color.white
+                set_text(t_name, "-")
+                set_text(t_score, "-")
+                set_color(t_name, color.white)
+                set_color(t_score, color.white)
 
     def update_mode_display(self):
         mode_data = self.modes[self.current_mode_index]
-        self.mode_name_text.text = mode_data['name']
-        self.mode_desc_text.text = mode_data['desc']
-        self.mode_name_text.color = mode_data['color']
+        set_text(self.mode_name_text, mode_data['name'])
+        set_text(self.mode_desc_text, mode_data['desc'])
+        set_color(self.mode_name_text, mode_data['color'])
         self.update_leaderboard()
         
         if self.on_mode_changed_callback:
@@ -470,6 +514,8 @@ class MainMenu(Entity):
 
             if selected_mode_key == 'classic_large':
                 grid_size_preview = 10
+            elif selected_mode_key == 'classic_huge':
+                grid_size_preview = config.HUGE_GRID_SIZE
             elif selected_mode_key == 'obstacles':
                 grid_size_preview = 8
             elif selected_mode_key == 'ai_hard':
@@ -524,6 +570,8 @@ class MainMenu(Entity):
 
         if selected_mode_key == 'classic_large':
             config.GRID_SIZE = 10
+        elif selected_mode_key == 'classic_huge':
+            config.GRID_SIZE = config.HUGE_GRID_SIZE
         elif selected_mode_key == 'obstacles':
             config.GRID_SIZE = 8
         elif selected_mode_key == 'ai_hard':
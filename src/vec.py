@@ -0,0 +1,67 @@
+"""
+Small pure-Python vector used by the game logic.
+Keeps rules, AI and tools importable without the engine.
+"""
+
+import math
+
+
+class Vec3(tuple):
+    """
+    Immutable (x, y, z) tuple with the vector operations the game logic needs.
+    Grid positions and directions stay integers, so == and hashing are exact.
+    Can be passed anywhere ursina accepts a position tuple.
+    """
+    __slots__ = ()
+
+    def __new__(cls, x=0, y=0, z=0):
+        return tuple.__new__(cls, (x, y, z))
+
+    @property
+    def x(self): return self[0]
+
+    @property
+    def y(self): return self[1]
+
+    @property
+    def z(self): return self[2]
+
+    def __add__(self, other):
+        return Vec3(self[0] + other[0], self[1] + other[1], self[2] + other[2])
+
+    def __sub__(self, other):
+        return Vec3(self[0] - other[0], self[1] - other[1], self[2] - other[2])
+
+    def __neg__(self):
+        return Vec3(-self[0], -self[1], -self[2])
+
+    def __mul__(self, value):
+        return Vec3(self[0] * value, self[1] * value, self[2] * value)
+
+    __rmul__ = __mul__
+
+    def dot(self, other):
+        return self[0] * other[0] + self[1] * other[1] + self[2] * other[2]
+
+    def cross(self, other):
+        return Vec3(
+            self[1] * other[2] - self[2] * other[1],
+            self[2] * other[0] - self[0] * other[2],
+            self[0] * other[1] - self[1] * other[0]
+        )
+
+    def length(self):
+        return math.sqrt(self.dot(self))
+
+    def normalized(self):
+        length = self.length()
+        # Axis-aligned unit vectors stay integer
+        if length == 0 or length == 1: return self
+        return Vec3(self[0] / length, self[1] / length, self[2] / length)
+
+    def __repr__(self):
+        return f'Vec3({self[0]}, {self[1]}, {self[2]})'
+
+
+def distance(a, b):
+    return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
@@ -0,0 +1,559 @@
+"""
+Presentation layer: ursina entities mirroring the game logic objects.
+Logic classes (player.Snake, ai.AISnake, food.Food) call the on_* hooks of
+their attached view after they change.
+Views take their entities from pool.py and give them back in destroy(), so
+restarts and menu previews reuse the same nodes.
+Snake views draw the snakes between their last two ticks (interpolation.py).
+"""
+
+import math
+import time
+from ursina import Entity, Vec3, Quat, color, load_model, camera, lerp
+from panda3d.core import NodePath, GeomNode, Geom, GeomVertexData, GeomTriangles, GeomPoints, GeomVertexRewriter, Thread
+from panda3d.core import GeomVertexArrayFormat, GeomVertexFormat, InternalName
+from array import array
+import config
+import world
+from config import SNAKE_BODY_MODEL, SNAKE_HEAD_MODEL, SNAKE_FOOD_MODEL, SNAKE_BODY_SCALE, SNAKE_HEAD_SCALE, FOOD_SCALE
+from palette import FOOD_COLOR, GRID_COLOR, BOUNDARY_COLOR, OBSTACLE_COLOR, SNAKE_GRADIENT, AI_GRADIENT
+from player import StandardStrategy
+import orientation
+from segments import create_segments
+from pool import get_pool
+from culling import get_group
+from lod import lod_model
+import scheduler
+import interpolation
+from interpolation import Snapshots, blend_quat
+
+# ==========================================
+# 0. Debug Helpers
+# ==========================================
+def create_debug_axes(parent, scale=2):
+    """建立跟隨物件移動的局部座標軸 (Local Axes)"""
+    # X Axis (Red) - Right
+    Entity(parent=parent, model='cube', color=color.red, 
+           scale=(scale, 0.05, 0.05), position=(scale/2, 0, 0))
+    # Y Axis (Green) - Up
+    Entity(parent=parent, model='cube', color=color.green, 
+           scale=(0.05, scale, 0.05), position=(0, scale/2, 0))
+    # Z Axis (Blue) - Forward
+    Entity(parent=parent, model='cube', color=color.blue, 
+           scale=(0.05, 0.05, scale), position=(0, 0, scale/2))
+
+def create_world_axes(length=10, thickness=0.1):
+    """建立固定在世界中心的世界座標軸 (World Axes)"""
+    # World Center Marker
+    Entity(model='sphere', scale=0.5, color=color.white, position=(0,0,0))
+    
+    # World X Axis (Red)
+    Entity(model='cube', scale=(length, thickness, thickness), color=color.red, 
+           position=(length/2, 0, 0), texture='white_cube')
+    # World Y Axis (Green)
+    Entity(model='cube', scale=(thickness, length, thickness), color=color.green, 
+           position=(0, length/2, 0), texture='white_cube')
+    # World Z Axis (Blue)
+    Entity(model='cube', scale=(thickness, thickness, length), color=color.blue, 
+           position=(0, 0, length/2), texture='white_cube')
+
+# ==========================================
+# 1. Head Model Orientation
+# ==========================================
+
+# Both strategies only produce axis-aligned (direction, up) pairs, so every
+# head rotation is computed once here instead of on every move.
+
+def _free_roam_rotation(direction, up):
+    try:
+        return Quat.from_forward_and_up(Vec3(*direction), Vec3(*up)).euler
+    except Exception:
+        return None
+
+# FREE_ROAM_ROTATIONS[orientation] -> euler rotation (None: use look_at)
+FREE_ROAM_ROTATIONS = tuple(_free_roam_rotation(direction, up) for direction, up in orientation.ORIENTATIONS)
+
+def orient_free_roam(model, snake):
+    """
+    負責更新蛇頭模型的朝向 (Rotation)。
+    """
+    rotation = FREE_ROAM_ROTATIONS[snake.orientation]
+    if rotation is None:
+        model.look_at(Vec3(*snake.head) + Vec3(*snake.direction))
+    else:
+        model.rotation = rotation
+
+def _standard_rotation(current_dir, ref_dir):
+    # 判斷是否在水平面上 (方向不平行於 Y 軸)
+    if current_dir.y == 0:
+        # 直接用水平方向的 Yaw，不滾轉
+        yaw = math.degrees(math.atan2(current_dir.x, current_dir.z))
+        return Vec3(0, yaw, 0)
+
+    # 垂直移動時 (爬牆)
+    # 向上時抬頭90度，向下時低頭90度
+    yaw = math.degrees(math.atan2(ref_dir.x, ref_dir.z))
+    if current_dir.y > 0: # 向上
+        # X = -90 代表向上看 (抬頭)
+        return Vec3(-90, yaw, 0)
+    # X = 90 代表向下看 (低頭)
+    return Vec3(90, yaw, 0)
+
+# STANDARD_ROTATIONS[direction axis][horizontal_forward_ref axis] -> euler rotation
+STANDARD_ROTATIONS = tuple(tuple(_standard_rotation(direction, ref) for ref in orientation.AXES) for direction in orientation.AXES)
+
+def orient_standard(model, snake):
+    """
+    Standard 策略的模型朝向更新邏輯 (視覺層)。
+    使用最直接的屬性賦值來鎖定方向，避免 Quat 計算誤差。
+    """
+    strategy = snake.current_strategy
+    model.rotation = STANDARD_ROTATIONS[orientation.AXIS_INDEX[snake.direction]][orientation.AXIS_INDEX[strategy.horizontal_forward_ref]]
+
+# ==========================================
+# 2. Snakes
+# ==========================================
+
+def _new_head_model():
+    head_model = Entity()
+    
+    # Visual Mesh
+    head_model.mesh = Entity(
+        parent=head_model,
+        model=lod_model(SNAKE_HEAD_MODEL, SNAKE_HEAD_SCALE),
+        scale=SNAKE_HEAD_SCALE,
+        rotation_z=180, 
+        rotation_y=270,
+        rotation_x=180   
+    )
+    return head_model
+
+head_pool = get_pool('snake head', _new_head_model)
+
+
+class SnakeView:
+    """
+    Body segments and head model for a player.Snake.
+    Every move publishes the head's cell and model transform as a snapshot;
+    interpolate() draws the head and body between the last two of them.
+    """
+    def __init__(self, snake):
+        self.snake = snake
+        snake.view = self
+
+        # The head segment is hidden, the head model is drawn there instead
+        self.segments = create_segments(SNAKE_BODY_MODEL, SNAKE_BODY_SCALE, SNAKE_GRADIENT, snake.body, first=1)
+        
+        self.head_model = head_pool.acquire()
+        self.head_mesh = self.head_model.mesh
+        self.drawn_head = Vec3(*snake.head) # Interpolated head cell (the camera follows it)
+
+        self.snapshots = Snapshots(None, 1 / config.SNAKE_SPEED)
+        self._apply_model_orientation_and_offset(jump=True)
+        interpolation.add(self)
+
+    def _apply_model_orientation_and_offset(self, jump=False):
+        if not self.head_model: return
+        self.head_model.position = self.snake.head
+        if isinstance(self.snake.current_strategy, StandardStrategy):
+            orient_standard(self.head_model, self.snake)
+        else:
+            orient_free_roam(self.head_model, self.snake)
+        self.head_model.position += Vec3(*self.snake.direction) * 0.2
+        # Publish the target transform, interpolate() takes it from here
+        self.snapshots.publish((Vec3(*self.snake.head), self.head_model.position, self.head_model.getQuat()), jump)
+        self.interpolate(time.perf_counter())
+
+    def interpolate(self, now):
+        alpha = self.snapshots.alpha(now)
+        self.segments.interpolate(alpha)
+        previous, current = self.snapshots.previous, self.snapshots.current
+        if alpha == 1.0 and self.drawn_head == current[0]: return
+        self.drawn_head = lerp(previous[0], current[0], alpha)
+        if self.head_model:
+            self.head_model.setPos(lerp(previous[1], current[1], alpha))
+            self.head_model.setQuat(blend_quat(previous[2], current[2], alpha))
+
+    def on_move(self):
+        self.segments.on_move(self.snake.head)
+        self._apply_model_orientation_and_offset()
+
+    def on_grow(self):
+        self.segments.on_grow(self.snake.body[-1])
+
+    def on_reverse(self):
+        self.segments.on_reverse(self.snake.body)
+        self._apply_model_orientation_and_offset(jump=True)
+
+    def destroy_head(self):
+        if self.head_model:
+            head_pool.release(self.head_model)
+            self.head_model = None
+
+    def destroy(self):
+        interpolation.remove(self)
+        self.segments.destroy()
+        self.destroy_head()
+        self.snake.view = None
+
+
+class AISnakeView:
+    """Cube segments for an ai.AISnake (fading towards the tail)."""
+    def __init__(self, ai_snake):
+        self.ai_snake = ai_snake
+        ai_snake.view = self
+        self.segments = create_segments('cube', 1, AI_GRADIENT, ai_snake.body)
+        # Only the tick times matter, the segments keep their own previous placements
+        self.snapshots = Snapshots(None, 1 / ai_snake.speed)
+        interpolation.add(self)
+
+    def interpolate(self, now):
+        self.segments.interpolate(self.snapshots.alpha(now))
+
+    def on_move(self):
+        # Cubes look the same in every axis direction, no need to turn the head
+        self.segments.on_move(self.ai_snake.head)
+        self.snapshots.publish(None)
+
+    def on_grow(self):
+        self.segments.on_grow(self.ai_snake.body[-1])
+
+    def destroy(self):
+        interpolation.remove(self)
+        self.segments.destroy()
+
+# ==========================================
+# 3. Food
+# ==========================================
+
+food_pool = get_pool('food', lambda: Entity(model=lod_model(SNAKE_FOOD_MODEL, FOOD_SCALE), color=FOOD_COLOR, scale=FOOD_SCALE, collider=None))
+
+
+class FoodView:
+    def __init__(self, food):
+        self.food = food
+        food.view = self
+        self.entity = food_pool.acquire()
+        self.entity.position = food.position
+
+    def on_reposition(self):
+        self.entity.position = self.food.position
+
+    def destroy(self):
+        food_pool.release(self.entity)
+        self.food.view = None
+
+# ==========================================
+# 4. Obstacles
+# ==========================================
+
+def _new_obstacles_entity():
+    cube = load_model('cube').findAllMatches('**/+GeomNode')[0].node().getGeom(0)
+    geom = Geom(GeomVertexData('obstacles', cube.getVertexData().getFormat(), Geom.UH_dynamic))
+    geom.addPrimitive(GeomTriangles(Geom.UH_dynamic))
+    node = GeomNode('obstacles')
+    node.addGeom(geom)
+
+    entity = Entity(model=NodePath(node), color=OBSTACLE_COLOR, collider=None)
+    entity.cube = cube.getVertexData() # Copied once per obstacle
+    return entity
+
+obstacles_pool = get_pool('obstacles', _new_obstacles_entity)
+
+
+class ObstaclesView:
+    """
+    The obstacles of an obstacles.Obstacles, one mesh (one draw call) per
+    GRID_CHUNK_SIZE chunk so chunks out of view are culled. A new obstacle
+    appends a copy of the cube's vertices to its chunk's mesh, nothing is
+    rebuilt.
+    """
+    def __init__(self, obstacles):
+        self.obstacles = obstacles
+        obstacles.view = self
+        self.parts = {} # chunk -> Entity
+        self.cull = get_group('obstacles', config.CULL_DISTANCE)
+        for position in obstacles.positions:
+            self.on_add(position)
+
+    def _part(self, chunk):
+        if chunk not in self.parts:
+            entity = obstacles_pool.acquire()
+            geom = entity.model.node().modifyGeom(0)
+            geom.modifyVertexData().setNumRows(0)
+            geom.modifyPrimitive(0).clearVertices()
+            self.parts[chunk] = entity
+            self.cull.add(entity)
+        return self.parts[chunk]
+
+    def on_add(self, position):
+        entity = self._part(world.chunk_of(position, config.GRID_CHUNK_SIZE))
+        cube = entity.cube
+        rows = cube.getNumRows()
+        geom = entity.model.node().modifyGeom(0)
+        vertex_data = geom.modifyVertexData()
+        start = vertex_data.getNumRows()
+
+        vertex_data.setNumRows(start + rows)
+        thread = Thread.getCurrentThread()
+        for row in range(rows):
+            vertex_data.copyRowFrom(start + row, cube, row, thread)
+        vertex = GeomVertexRewriter(vertex_data, 'vertex')
+        vertex.setRow(start)
+        for row in range(rows):
+            x, y, z = vertex.getData3()
+            vertex.setData3(x + position[0], y + position[1], z + position[2])
+
+        geom.modifyPrimitive(0).addConsecutiveVertices(start, rows)
+        self.cull.refresh()
+
+    def destroy(self):
+        for entity in self.parts.values():
+            self.cull.remove(entity)
+            obstacles_pool.release(entity)
+        self.parts = {}
+        self.obstacles.view = None
+
+# ==========================================
+# 5. Grid
+# ==========================================
+
+def create_boundary_planes(parent):
+    # Order: +X, -X, +Y, -Y, +Z, -Z
+    boundary_plane_alpha = 0.1
+    return [Entity(parent=parent, model='cube', color=BOUNDARY_COLOR, alpha=boundary_plane_alpha) for i in range(6)]
+
+def place_boundary_planes(planes, size):
+    # Scale: One dimension is 0.1 (thickness), others are size+1
+    thick = 0.1
+    span = size + 1
+    offset = size // 2 + 0.5
+    
+    # +X
+    planes[0].scale = (thick, span, span)
+    planes[0].position = (offset, 0, 0)
+    
+    # -X
+    planes[1].scale = (thick, span, span)
+    planes[1].position = (-offset, 0, 0)
+    
+    # +Y
+    planes[2].scale = (span, thick, span)
+    planes[2].position = (0, offset, 0)
+    
+    # -Y
+    planes[3].scale = (span, thick, span)
+    planes[3].position = (0, -offset, 0)
+    
+    # +Z
+    planes[4].scale = (span, span, thick)
+    planes[4].position = (0, 0, offset)
+    
+    # -Z
+    planes[5].scale = (span, span, thick)
+    planes[5].position = (0, 0, -offset)
+
+
+class WorldGrid(Entity):
+    def __init__(self, lazy=False):
+        """
+        If `lazy` is True the grid shells are not generated here; call build_shell()
+        for each radius (e.g. one per frame during startup). set_size() builds any
+        shell that is still missing.
+        """
+        super().__init__()
+        
+        self.shells = []
+        
+        # We'll use MAX_GRID_SIZE to generate all possible points once
+        self.max_half_grid = config.MAX_GRID_SIZE // 2
+        self.joint_size = 0.075
+        
+        # For coloring, we use the max radius as reference so the gradient is consistent
+        self.max_dist_ref = Vec3(self.max_half_grid, self.max_half_grid, self.max_half_grid).length()
+
+        # --- 1. Pre-generate Grid Shells ---
+        if not lazy:
+            for r in range(self.max_half_grid + 1):
+                self.build_shell(r)
+
+        # --- 2. Create Boundary Planes (Mutable) ---
+        # We create them once and just move/scale them in set_size
+        self.boundary_planes = create_boundary_planes(self)
+
+        # Initialize with default size
+        if not lazy:
+            self.set_size(config.GRID_SIZE)
+
+    def build_shell(self, r):
+        """
+        Generates the shell of radius r (must be the next missing one).
+        Shell 0 is just the center point (0,0,0)
+        Shell R contains points where max(|x|,|y|,|z|) == R
+        """
+        if r != len(self.shells): return
+
+        shell_parent = Entity(parent=self)
+        # Each shell is split in chunks so the camera frustum / distance can cull them
+        chunks = {}
+        cull = get_group('grid', config.CULL_DISTANCE)
+        
+        # Optimization: If r=0, just one point
+        if r == 0:
+            points_to_check = [(0,0,0)]
+        else:
+            # We need all (x,y,z) such that max(|x|,|y|,|z|) == r
+            points_to_check = []
+            for x in range(-r, r + 1):
+                for y in range(-r, r + 1):
+                    for z in range(-r, r + 1):
+                        if max(abs(x), abs(y), abs(z)) == r:
+                            points_to_check.append((x,y,z))
+
+        for (x,y,z) in points_to_check:
+            position = Vec3(x, y, z)
+            dist = position.length()
+            
+            if self.max_dist_ref > 0:
+                norm_dist = dist / self.max_dist_ref
+            else:
+                norm_dist = 0
+
+            # Alpha: closer is more opaque
+            alpha = 1 - (norm_dist * 0.8)
+            if alpha < config.GRID_ALPHA_CUTOFF: continue
+            
+            # Brightness: closer is brighter
+            brightness = 1 - (norm_dist * 0.5)
+            
+            joint_color = color.Color(GRID_COLOR.r * brightness, 
+                                      GRID_COLOR.g * brightness, 
+                                      GRID_COLOR.b * brightness, 
+                                      alpha)
+
+            chunk = world.chunk_of(position, config.GRID_CHUNK_SIZE)
+            if chunk not in chunks:
+                chunks[chunk] = Entity(parent=shell_parent)
+            Entity(parent=chunks[chunk], model='sphere', color=joint_color, scale=self.joint_size, position=position)
+        
+        # Combine each chunk of this shell into one mesh
+        for chunk_entity in chunks.values():
+            chunk_entity.combine()
+            cull.add(chunk_entity)
+        shell_parent.enabled = False # Hide initially
+        self.shells.append(shell_parent)
+
+    def set_size(self, size):
+        half_grid = size // 2
+
+        # Make sure every shell we need exists
+        for r in range(len(self.shells), min(half_grid, self.max_half_grid) + 1):
+            self.build_shell(r)
+        
+        # 1. Update Shell Visibility
+        # Enable shells 0 to half_grid
+        for r, shell in enumerate(self.shells):
+            if r <= half_grid:
+                shell.enabled = True
+            else:
+                shell.enabled = False
+                
+        # 2. Update Boundary Planes
+        place_boundary_planes(self.boundary_planes, size)
+
+
+# Chunk meshes: one point per joint, float position and color
+_chunk_array = GeomVertexArrayFormat()
+_chunk_array.addColumn(InternalName.getVertex(), 3, Geom.NT_float32, Geom.C_point)
+_chunk_array.addColumn(InternalName.getColor(), 4, Geom.NT_float32, Geom.C_color)
+CHUNK_FORMAT = GeomVertexFormat.registerFormat(GeomVertexFormat(_chunk_array))
+
+
+class ChunkedGrid(Entity):
+    """
+    Grid for sizes above MAX_GRID_SIZE. Only the chunks (world.CHUNK_SIZE
+    cells per side) within CHUNK_VIEW_DISTANCE of the camera's chunk exist.
+    Each is one point mesh, built when it comes in range (CHUNKS_PER_FRAME
+    per frame) and recycled when it goes out of range, by the 'grid chunks'
+    scheduler system while the grid is enabled.
+    """
+    def __init__(self):
+        scheduler.add('grid chunks', self.load_chunks, scheduler.CHUNKS)
+        super().__init__()
+        self.size = None
+        self.max_dist_ref = 1
+        self.chunks = {}   # chunk -> Entity
+        self.missing = []  # Chunks in range without a mesh yet, nearest first
+        self.camera_chunk = None
+        self.chunk_pool = get_pool('grid chunk', self._new_chunk_entity)
+        self.cull = get_group('grid chunks', config.CULL_DISTANCE)
+        self.boundary_planes = create_boundary_planes(self)
+
+    def _new_chunk_entity(self):
+        geom = Geom(GeomVertexData('grid chunk', CHUNK_FORMAT, Geom.UH_static))
+        geom.addPrimitive(GeomPoints(Geom.UH_static))
+        node = GeomNode('grid chunk')
+        node.addGeom(geom)
+        entity = Entity(parent=self, model=NodePath(node))
+        entity.model.setRenderModeThickness(2)
+        return entity
+
+    def set_size(self, size):
+        self.size = size
+        half_grid = size // 2
+        self.max_dist_ref = Vec3(half_grid, half_grid, half_grid).length()
+        for entity in self.chunks.values():
+            self._release_chunk(entity)
+        self.chunks = {}
+        self.missing = []
+        self.camera_chunk = None
+        place_boundary_planes(self.boundary_planes, size)
+
+    def _build_chunk(self, chunk):
+        cells = world.chunk_cells(chunk, self.size)
+        data = array('f')
+        r, g, b = GRID_COLOR.r, GRID_COLOR.g, GRID_COLOR.b
+        scale = 1 / self.max_dist_ref
+        count = 0
+        for x, y, z in cells:
+            # Same gradient and cutoff as WorldGrid: closer to the center is brighter and more opaque
+            norm_dist = math.sqrt(x * x + y * y + z * z) * scale
+            alpha = 1 - (norm_dist * 0.8)
+            if alpha < config.GRID_ALPHA_CUTOFF: continue
+            brightness = 1 - (norm_dist * 0.5)
+            data.extend((x, y, z, r * brightness, g * brightness, b * brightness, alpha))
+            count += 1
+
+        entity = self.chunk_pool.acquire()
+        geom = entity.model.node().modifyGeom(0)
+        vertex_data = geom.modifyVertexData()
+        vertex_data.uncleanSetNumRows(count)
+        memoryview(vertex_data.modifyArray(0)).cast('B').cast('f')[:] = data
+        points = geom.modifyPrimitive(0)
+        points.clearVertices()
+        if count: points.addConsecutiveVertices(0, count)
+        self.chunks[chunk] = entity
+        self.cull.add(entity)
+
+    def _release_chunk(self, entity):
+        self.cull.remove(entity)
+        self.chunk_pool.release(entity)
+
+    def on_enable(self):
+        scheduler.set_active('grid chunks', True)
+
+    def on_disable(self):
+        scheduler.set_active('grid chunks', False)
+
+    def load_chunks(self):
+        if self.size is None: return
+        camera_chunk = world.chunk_of(camera.world_position)
+        if camera_chunk != self.camera_chunk:
+            self.camera_chunk = camera_chunk
+            in_range = world.chunks_near(camera.world_position, config.CHUNK_VIEW_DISTANCE, self.size)
+            for chunk in set(self.chunks) - set(in_range):
+                self._release_chunk(self.chunks.pop(chunk))
+            self.missing = [chunk for chunk in in_range if chunk not in self.chunks]
+
+        for _ in range(min(config.CHUNKS_PER_FRAME, len(self.missing))):
+            self._build_chunk(self.missing.pop(0))
@@ -1,121 +1,132 @@
 """
-The game world, including the grid.
+World rules: grid bounds and free cell lookup.
+Grids bigger than MAX_GRID_SIZE are handled in chunks of CHUNK_SIZE cells:
+ChunkedCells stores cells sparsely per chunk and only the chunks around the
+camera are drawn (views.ChunkedGrid), so memory and frame cost follow what
+is occupied and visible, not the volume.
+The grid rendering lives in views.py (WorldGrid, ChunkedGrid).
 """
 
-from ursina import Entity, Pipe, Vec3, color, destroy
+import random
 import config
-from config import GRID_COLOR, BOUNDARY_COLOR
-
-class WorldGrid(Entity):
-    def __init__(self):
-        super().__init__()
-        
-        self.shells = []
-        self.boundary_planes = []
-        
-        # We'll use MAX_GRID_SIZE to generate all possible points once
-        max_half_grid = config.MAX_GRID_SIZE // 2
-        joint_size = 0.075
-        
-        # --- 1. Pre-generate Grid Shells ---
-        # Shell 0 is just the center point (0,0,0)
-        # Shell R contains points where max(|x|,|y|,|z|) == R
-        
-        # For coloring, we use the max radius as reference so the gradient is consistent
-        max_dist_ref = Vec3(max_half_grid, max_half_grid, max_half_grid).length()
-
-        for r in range(max_half_grid + 1):
-            shell_parent = Entity(parent=self)
-            
-            # Optimization: If r=0, just one point
-            if r == 0:
-                points_to_check = [(0,0,0)]
-            else:
-                # We need all (x,y,z) such that max(|x|,|y|,|z|) == r
-                points_to_check = []
-                for x in range(-r, r + 1):
-                    for y in range(-r, r + 1):
-                        for z in range(-r, r + 1):
-                            if max(abs(x), abs(y), abs(z)) == r:
-                                points_to_check.append((x,y,z))
-
-            for (x,y,z) in points_to_check:
-                position = Vec3(x, y, z)
-                dist = position.length()
-                
-                if max_dist_ref > 0:
-                    norm_dist = dist / max_dist_ref
-                else:
-                    norm_dist = 0
-
-                # Alpha: closer is more opaque
-                alpha = 1 - (norm_dist * 0.8)
-                
-                # Brightness: closer is brighter
-                brightness = 1 - (norm_dist * 0.5)
-                
-                joint_color = color.Color(GRID_COLOR.r * brightness, 
-                                          GRID_COLOR.g * brightness, 
-                                          GRID_COLOR.b * brightness, 
-                                          alpha)
-
-                Entity(parent=shell_parent, model='sphere', color=joint_color, scale=joint_size, position=position)
-            
-            # Combine this shell into one mesh
-            shell_parent.combine()
-            shell_parent.enabled = False # Hide initially
-            self.shells.append(shell_parent)
-
-        # --- 2. Create Boundary Planes (Mutable) ---
-        # We create them once and just move/scale them in set_size
-        boundary_plane_alpha = 0.1
-        
-        # Store them in a list or dict. 
-        # Order: +X, -X, +Y, -Y, +Z, -Z
-        for i in range(6):
-            bp = Entity(parent=self, model='cube', color=BOUNDARY_COLOR, alpha=boundary_plane_alpha)
-            self.boundary_planes.append(bp)
-
-        # Initialize with default size
-        self.set_size(config.GRID_SIZE)
-
-    def set_size(self, size):
-        half_grid = size // 2
-        
-        # 1. Update Shell Visibility
-        # Enable shells 0 to half_grid
-        for r, shell in enumerate(self.shells):
-            if r <= half_grid:
-                shell.enabled = True
-            else:
-                shell.enabled = False
-                
-        # 2. Update Boundary Planes
-        # Scale: One dimension is 0.1 (thickness), others are size+1
-        thick = 0.1
-        span = size + 1
-        offset = half_grid + 0.5
-        
-        # +X
-        self.boundary_planes[0].scale = (thick, span, span)
-        self.boundary_planes[0].position = (offset, 0, 0)
-        
-        # -X
-        self.boundary_planes[1].scale = (thick, span, span)
-        self.boundary_planes[1].position = (-offset, 0, 0)
-        
-        # +Y
-        self.boundary_planes[2].scale = (span, thick, span)
-        self.boundary_planes[2].position = (0, offset, 0)
-        
-        # -Y
-        self.boundary_planes[3].scale = (span, thick, span)
-        self.boundary_planes[3].position = (0, -offset, 0)
-        
-        # +Z
-        self.boundary_planes[4].scale = (span, span, thick)
-        self.boundary_planes[4].position = (0, 0, offset)
-        
-        # -Z
-        self.boundary_planes[5].scale = (span, span, thick)
-        self.boundary_planes[5].position = (0, 0, -offset)
\ No newline at end of file
+
+
+def is_outside(position, grid_size=None):
+    """True if `position` is past the walls of a grid of `grid_size`."""
+    if grid_size is None: grid_size = config.GRID_SIZE
+    half_grid = grid_size // 2
+    return (position[0] > half_grid or position[0] < -half_grid or
+            position[1] > half_grid or position[1] < -half_grid or
+            position[2] > half_grid or position[2] < -half_grid)
+
+
+def random_cell(grid_size=None, near=None):
+    """
+    Random cell one step away from the walls. In grids bigger than
+    MAX_GRID_SIZE the cell is picked within MAX_GRID_SIZE // 2 of `near`
+    (if given), so food doesn't end up a hundred cells away.
+    """
+    if grid_size is None: grid_size = config.GRID_SIZE
+    half_grid = grid_size // 2
+    if near is None or grid_size <= config.MAX_GRID_SIZE:
+        return (
+            random.randint(-half_grid + 1, half_grid - 1),
+            random.randint(-half_grid + 1, half_grid - 1),
+            random.randint(-half_grid + 1, half_grid - 1)
+        )
+    reach = config.MAX_GRID_SIZE // 2
+    return tuple(
+        random.randint(max(-half_grid + 1, round(near[i]) - reach), min(half_grid - 1, round(near[i]) + reach))
+        for i in range(3)
+    )
+
+
+def find_free_cell(occupied_positions, grid_size=None, attempts=100, near=None):
+    """
+    Tries up to `attempts` random cells and returns the first one not in
+    `occupied_positions`, or None if the grid looks full.
+    """
+    # Compare rounded positions to handle float inaccuracies
+    occupied = {(round(p[0]), round(p[1]), round(p[2])) for p in occupied_positions}
+    for _ in range(attempts):
+        pos = random_cell(grid_size, near)
+        if pos not in occupied:
+            return pos
+    return None
+
+
+# ==========================================
+# Chunks
+# ==========================================
+
+def chunk_of(position, chunk_size=None):
+    """Chunk coordinates of the cell at `position`."""
+    if chunk_size is None: chunk_size = config.CHUNK_SIZE
+    return (round(position[0]) // chunk_size, round(position[1]) // chunk_size, round(position[2]) // chunk_size)
+
+
+def chunk_bounds(grid_size=None, chunk_size=None):
+    """(first, last) chunk coordinate on each axis of a grid."""
+    if grid_size is None: grid_size = config.GRID_SIZE
+    if chunk_size is None: chunk_size = config.CHUNK_SIZE
+    half_grid = grid_size // 2
+    return -half_grid // chunk_size, half_grid // chunk_size
+
+
+def chunks_near(position, distance, grid_size=None, chunk_size=None):
+    """Chunks within `distance` chunks of `position` (per axis) that are inside the grid, nearest first."""
+    first, last = chunk_bounds(grid_size, chunk_size)
+    center = [min(max(c, first), last) for c in chunk_of(position, chunk_size)]
+    ranges = [range(max(first, c - distance), min(last, c + distance) + 1) for c in center]
+    chunks = [(x, y, z) for x in ranges[0] for y in ranges[1] for z in ranges[2]]
+    chunks.sort(key=lambda c: max(abs(c[0] - center[0]), abs(c[1] - center[1]), abs(c[2] - center[2])))
+    return chunks
+
+
+def chunk_cells(chunk, grid_size=None, chunk_size=None):
+    """The cells of `chunk` that are inside the grid."""
+    if grid_size is None: grid_size = config.GRID_SIZE
+    if chunk_size is None: chunk_size = config.CHUNK_SIZE
+    half_grid = grid_size // 2
+    ranges = [range(max(-half_grid, c * chunk_size), min(half_grid, c * chunk_size + chunk_size - 1) + 1) for c in chunk]
+    return [(x, y, z) for x in ranges[0] for y in ranges[1] for z in ranges[2]]
+
+
+class ChunkedCells:
+    """
+    Sparse set of cells stored per chunk ({chunk: set of cells}), so memory
+    follows the number of cells and one area can be read without going
+    through the others.
+    """
+    def __init__(self, chunk_size=None):
+        self.chunk_size = chunk_size or config.CHUNK_SIZE
+        self.chunks = {}
+        self.count = 0
+
+    def __contains__(self, cell):
+        cells = self.chunks.get(chunk_of(cell, self.chunk_size))
+        return cells is not None and cell in cells
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for cells in self.chunks.values():
+            yield from cells
+
+    def add(self, cell):
+        cells = self.chunks.setdefault(chunk_of(cell, self.chunk_size), set())
+        if cell not in cells:
+            cells.add(cell)
+            self.count += 1
+
+    def discard(self, cell):
+        chunk = chunk_of(cell, self.chunk_size)
+        cells = self.chunks.get(chunk)
+        if cells and cell in cells:
+            cells.remove(cell)
+            self.count -= 1
+            if not cells: del self.chunks[chunk]
+
+    def in_chunk(self, chunk):
+        return self.chunks.get(chunk, ())
@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The game modules live flat in src/ and import each other by name
+sys.path.insert(0, str(ROOT / 'src'))
+
+
+@pytest.fixture(scope='session')
+def app():
+    """An offscreen Ursina app (one per test run). Skips without a graphics pipe."""
+    from panda3d.core import GraphicsPipeSelection, loadPrcFileData
+    loadPrcFileData('', 'audio-library-name null')
+    if GraphicsPipeSelection.getGlobalPtr().makeDefaultPipe() is None:
+        pytest.skip("no graphics pipe")
+    from ursina import Ursina, application
+    try:
+        app = Ursina(window_type='offscreen')
+    except Exception as e:
+        pytest.skip(f"no offscreen window: {e}")
+    application.asset_folder = ROOT
+    application.development_mode = False # Don't write models_compressed
+    return app
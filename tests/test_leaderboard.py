@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+
+import pytest
+
+import leaderboard
+
+
+@pytest.fixture
+def score_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'highscores.json')
+    monkeypatch.setattr(leaderboard, 'SCORE_FILE', path)
+    monkeypatch.setattr(leaderboard, '_backend', None)
+    monkeypatch.setattr(leaderboard, '_cache', None)
+    monkeypatch.setattr(leaderboard, '_cache_stamp', None)
+    monkeypatch.setattr(leaderboard, '_last_check', 0.0)
+    yield path
+    leaderboard.flush()
+
+
+def write_scores(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def count_reads(monkeypatch):
+    reads = []
+    read_file = leaderboard._read_file
+    def counting():
+        reads.append(1)
+        return read_file()
+    monkeypatch.setattr(leaderboard, '_read_file', counting)
+    return reads
+
+
+# --- Cache (mtime/size invalidation) ---
+
+def test_unchanged_file_is_read_once(score_file, monkeypatch):
+    monkeypatch.setattr(leaderboard, 'CHECK_INTERVAL', 0)
+    write_scores(score_file, {'classic': [{'name': 'A', 'score': 3}], 'ai': []})
+    reads = count_reads(monkeypatch)
+
+    for _ in range(5):
+        assert leaderboard.load_scores('classic') == [{'name': 'A', 'score': 3}]
+    assert len(reads) == 1
+
+
+def test_changed_file_is_read_again(score_file, monkeypatch):
+    monkeypatch.setattr(leaderboard, 'CHECK_INTERVAL', 0)
+    write_scores(score_file, {'classic': [{'name': 'A', 'score': 3}], 'ai': []})
+    assert leaderboard.load_scores('classic') == [{'name': 'A', 'score': 3}]
+
+    # Another process writes the file
+    write_scores(score_file, {'classic': [{'name': 'B', 'score': 30}, {'name': 'A', 'score': 3}], 'ai': []})
+    assert leaderboard.load_scores('classic')[0] == {'name': 'B', 'score': 30}
+
+
+def test_file_is_not_checked_within_the_interval(score_file, monkeypatch):
+    monkeypatch.setattr(leaderboard, 'CHECK_INTERVAL', 3600)
+    write_scores(score_file, {'classic': [{'name': 'A', 'score': 3}], 'ai': []})
+    assert leaderboard.load_scores('classic') == [{'name': 'A', 'score': 3}]
+
+    write_scores(score_file, {'classic': [{'name': 'B', 'score': 30}], 'ai': []})
+    assert leaderboard.load_scores('classic') == [{'name': 'A', 'score': 3}]
+
+    leaderboard.invalidate_cache()
+    assert leaderboard.load_scores('classic') == [{'name': 'B', 'score': 30}]
+
+
+def test_missing_file_gives_empty_lists(score_file):
+    assert leaderboard.load_scores('classic') == []
+    assert leaderboard.load_scores('ai') == []
+
+
+def test_old_list_format_is_read_as_classic(score_file):
+    write_scores(score_file, [{'name': 'A', 'score': 3}])
+    assert leaderboard.load_scores('classic') == [{'name': 'A', 'score': 3}]
+    assert leaderboard.load_scores('ai') == []
+
+
+def test_corrupt_file_keeps_the_cached_table(score_file, monkeypatch):
+    monkeypatch.setattr(leaderboard, 'CHECK_INTERVAL', 0)
+    write_scores(score_file, {'classic': [{'name': 'A', 'score': 3}], 'ai': []})
+    assert leaderboard.load_scores('classic') == [{'name': 'A', 'score': 3}]
+
+    with open(score_file, 'w') as f:
+        f.write('{"classic": [{"na')
+    assert leaderboard.load_scores('classic') == [{'name': 'A', 'score': 3}]
+    with open(score_file + '.corrupt') as f:
+        assert f.read() == '{"classic": [{"na'
+
+
+# --- Background atomic writer ---
+
+def read_file(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_saved_score_is_cached_then_written(score_file):
+    leaderboard.save_new_score('A', 5)
+    # Visible right away, before the writer got to it
+    assert leaderboard.load_scores('classic') == [{'name': 'A', 'score': 5}]
+    assert leaderboard.flush()
+    assert read_file(score_file)['classic'] == [{'name': 'A', 'score': 5}]
+    assert not os.path.exists(score_file + '.tmp')
+
+
+def test_only_better_scores_are_saved(score_file):
+    leaderboard.save_new_score('A', 5)
+    leaderboard.save_new_score('A', 4)
+    leaderboard.save_new_score('Guest', 50)
+    assert leaderboard.flush()
+    assert read_file(score_file)['classic'] == [{'name': 'A', 'score': 5}]
+
+
+def test_bursts_are_coalesced(score_file, monkeypatch):
+    release = threading.Event()
+    writes = []
+    write_atomic = leaderboard._write_atomic
+    def slow_write(data):
+        release.wait(5)
+        writes.append(data)
+        write_atomic(data)
+    monkeypatch.setattr(leaderboard, '_write_atomic', slow_write)
+
+    for i in range(20):
+        leaderboard.save_new_score(f'P{i}', i, 'ai')
+    release.set()
+    assert leaderboard.flush()
+
+    assert len(writes) < 20
+    scores = read_file(score_file)['ai']
+    assert [entry['score'] for entry in scores] == list(range(19, 9, -1))
+
+
+def test_failed_write_keeps_the_old_file(score_file, monkeypatch):
+    write_scores(score_file, {'classic': [{'name': 'A', 'score': 3}], 'ai': []})
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, 'replace', failing_replace)
+
+    leaderboard.save_new_score('B', 30)
+    assert leaderboard.flush()
+    assert read_file(score_file)['classic'] == [{'name': 'A', 'score': 3}]
+
+
+def test_readers_never_see_a_partial_file(score_file):
+    leaderboard.save_new_score('P0', 0)
+    assert leaderboard.flush()
+    errors = []
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            try:
+                read_file(score_file)
+            except ValueError as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    try:
+        for i in range(1, 200):
+            leaderboard.save_new_score(f'P{i}' * 50, i)
+            leaderboard.flush()
+    finally:
+        done.set()
+        thread.join()
+    assert errors == []
+
+
+def test_flush_timeout_reaches_the_backend(score_file, monkeypatch):
+    class Backend:
+        def flush(self, timeout=5.0):
+            self.timeout = timeout
+            return False
+    backend = Backend()
+    monkeypatch.setattr(leaderboard, '_backend', backend)
+    assert leaderboard.flush(timeout=0.25) is False
+    assert backend.timeout == 0.25
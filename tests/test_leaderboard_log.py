@@ -0,0 +1,112 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import leaderboard_log
+from leaderboard_log import LogLeaderboard, RECORD
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+
+@pytest.fixture
+def files(tmp_path):
+    return str(tmp_path / 'highscores.json'), str(tmp_path / 'highscores.log')
+
+
+def log_records(log_file):
+    return os.path.getsize(log_file) // RECORD.size if os.path.exists(log_file) else 0
+
+
+def test_scores_are_shared_between_instances(files):
+    first, second = LogLeaderboard(*files), LogLeaderboard(*files)
+    first.save_new_score('A', 5)
+    second.save_new_score('B', 7)
+    first.save_new_score('Guest', 99)
+
+    expected = [{'name': 'B', 'score': 7}, {'name': 'A', 'score': 5}]
+    assert first.load_scores('classic') == expected
+    assert second.load_scores('classic') == expected
+    assert second.get_player_best('A') == 5
+
+
+def test_compaction_folds_the_log_into_the_snapshot(files, monkeypatch):
+    monkeypatch.setattr(leaderboard_log, 'COMPACT_RECORDS', 8)
+    snapshot_file, log_file = files
+    board, reader = LogLeaderboard(*files), LogLeaderboard(*files)
+
+    for i in range(7):
+        board.save_new_score(f'P{i}', i)
+    assert log_records(log_file) == 7
+    assert reader.load_scores('classic')[0] == {'name': 'P6', 'score': 6}
+
+    board.save_new_score('P7', 7)
+    assert log_records(log_file) == 0
+    with open(snapshot_file) as f:
+        assert [entry['score'] for entry in json.load(f)['classic']] == list(range(7, -1, -1))
+
+    # The reader had merged part of the log before it was truncated
+    board.save_new_score('P8', 8)
+    assert [entry['score'] for entry in reader.load_scores('classic')] == list(range(8, -1, -1))
+
+
+def test_compact_and_flush(files):
+    snapshot_file, log_file = files
+    board = LogLeaderboard(*files)
+    board.save_new_score('A', 5)
+    assert board.flush()
+    assert log_records(log_file) == 0
+    assert LogLeaderboard(*files).load_scores('classic') == [{'name': 'A', 'score': 5}]
+
+    # Nothing to fold: the snapshot is left alone
+    stamp = os.stat(snapshot_file).st_mtime_ns
+    assert board.compact()
+    assert os.stat(snapshot_file).st_mtime_ns == stamp
+
+
+def test_torn_tail_is_ignored_then_dropped(files):
+    _, log_file = files
+    board = LogLeaderboard(*files)
+    board.save_new_score('A', 5)
+    # A writer crashed halfway through a record
+    with open(log_file, 'ab') as f:
+        f.write(RECORD.pack(0.0, 50, b'classic', b'Torn')[:RECORD.size // 2])
+
+    reader = LogLeaderboard(*files)
+    assert reader.load_scores('classic') == [{'name': 'A', 'score': 5}]
+
+    board.save_new_score('B', 7)
+    assert os.path.getsize(log_file) == 2 * RECORD.size
+    assert reader.load_scores('classic') == [{'name': 'B', 'score': 7}, {'name': 'A', 'score': 5}]
+
+
+def test_long_names_are_cut_on_a_character_boundary(files):
+    board = LogLeaderboard(*files)
+    board.save_new_score('é' * 30, 5)
+    assert board.load_scores('classic') == [{'name': 'é' * 20, 'score': 5}]
+
+
+WRITER = """
+import sys
+sys.path.insert(0, sys.argv[1])
+import leaderboard_log
+leaderboard_log.COMPACT_RECORDS = 16
+board = leaderboard_log.LogLeaderboard(sys.argv[2], sys.argv[3])
+k = int(sys.argv[4])
+for i in range(150):
+    board.save_new_score(f'W{k}_{i}', 2 * i + k)
+    board.load_scores('classic')
+"""
+
+
+def test_two_writer_processes_lose_no_results(files):
+    writers = [subprocess.Popen([sys.executable, '-c', WRITER, SRC, *files, str(k)]) for k in (0, 1)]
+    for writer in writers:
+        assert writer.wait(60) == 0
+
+    scores = LogLeaderboard(*files).load_scores('classic')
+    # The best ten of both writers, interleaved
+    assert [entry['score'] for entry in scores] == list(range(299, 289, -1))
+    assert {entry['name'] for entry in scores} == {f'W{s % 2}_{s // 2}' for s in range(290, 300)}
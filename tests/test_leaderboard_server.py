@@ -0,0 +1,214 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+import leaderboard
+import leaderboard_client
+from leaderboard_client import LeaderboardClient
+from leaderboard_server import LeaderboardServer
+from leaderboard_sqlite import SQLiteLeaderboard
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until(check, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if check():
+            return True
+        time.sleep(0.02)
+    return check()
+
+
+class RecordingServer(LeaderboardServer):
+    """Keeps the size of every submitted batch, and can drop the first ack."""
+    def __init__(self, drop_first_ack=False):
+        super().__init__()
+        self.batches = []
+        self.drop_first_ack = drop_first_ack
+
+    async def submit(self, writer, entries):
+        self.batches.append(len(entries))
+        if self.drop_first_ack:
+            self.drop_first_ack = False
+            # Store the results, then lose the connection before the ack goes out
+            for entry in entries:
+                self.stored_ids[entry['id']] = True
+            await self.run_storage(self._store, entries)
+            writer.transport.abort()
+            return
+        await super().submit(writer, entries)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(leaderboard_client, 'RECONNECT_DELAY', 0.05)
+    started = threading.Event()
+    state = {}
+
+    def run(instance):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        state['loop'] = loop
+        state['board'] = SQLiteLeaderboard(str(tmp_path / 'scores.db'))
+        leaderboard.use_backend(state['board'])
+        state['task'] = loop.create_task(instance.serve('127.0.0.1', state['port']))
+        loop.call_soon(started.set)
+        try:
+            loop.run_until_complete(state['task'])
+        except asyncio.CancelledError:
+            pass
+        finally:
+            # Let the connection handlers finish before the loop goes away
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            leaderboard.use_backend(None)
+            state['board'].close()
+            loop.close()
+
+    def start(instance, port=None):
+        state['port'] = port or free_port()
+        thread = threading.Thread(target=run, args=(instance,), daemon=True)
+        thread.start()
+        started.wait(5)
+        state['thread'] = thread
+        state['instance'] = instance
+        return state
+
+    yield start
+
+    if 'loop' in state:
+        state['loop'].call_soon_threadsafe(state['task'].cancel)
+        state['thread'].join(5)
+
+
+@pytest.fixture
+def connect(tmp_path):
+    spool_file = str(tmp_path / 'highscores.spool')
+    def connect(port, batch_interval=0.05):
+        return LeaderboardClient('127.0.0.1', port, batch_interval=batch_interval, spool_file=spool_file)
+    connect.spool_file = spool_file
+    return connect
+
+
+def history(state):
+    """Game history rows, read on the server's storage thread."""
+    future = asyncio.run_coroutine_threadsafe(
+        state['instance'].run_storage(state['board'].history, None, None, 1000), state['loop'])
+    return future.result(5)
+
+
+def test_results_are_sent_in_batches(server, connect):
+    state = server(RecordingServer())
+    client = connect(state['port'], batch_interval=0.3)
+    assert wait_until(lambda: client.connected)
+
+    for i in range(5):
+        client.save_new_score(f'P{i}', 10 + i)
+    assert client.flush()
+
+    assert sum(state['instance'].batches) == 5
+    assert len(state['instance'].batches) < 5
+    assert len(history(state)) == 5
+
+
+def test_guest_results_are_not_sent(server, connect):
+    state = server(RecordingServer())
+    client = connect(state['port'])
+    assert wait_until(lambda: client.connected)
+
+    client.save_new_score('Guest', 50)
+    assert client.flush()
+    assert state['instance'].batches == []
+
+
+def test_top_lists_are_pushed_to_other_clients(server, connect):
+    state = server(RecordingServer())
+    sender = connect(state['port'])
+    watcher = connect(state['port'])
+    assert watcher.load_scores('classic') == []
+    assert wait_until(lambda: sender.connected and watcher.connected)
+
+    sender.save_new_score('Alice', 42)
+    # Shown locally right away, before the server answered
+    assert sender.load_scores('classic') == [{'name': 'Alice', 'score': 42}]
+    assert sender.flush()
+
+    assert wait_until(lambda: watcher.load_scores('classic') == [{'name': 'Alice', 'score': 42}])
+    assert watcher.get_player_best('Alice') == 42
+
+
+def test_flush_waits_for_the_server(server, connect, monkeypatch):
+    monkeypatch.setattr(leaderboard_client, 'RECONNECT_DELAY', 0.05)
+    port = free_port()
+    client = connect(port)
+    client.save_new_score('Alice', 42)
+    threading.Timer(0.3, server, args=(RecordingServer(), port)).start()
+
+    assert client.flush(timeout=5)
+    assert not os.path.exists(connect.spool_file)
+
+
+def test_results_unsent_at_flush_are_spooled_for_the_next_run(server, connect, monkeypatch):
+    monkeypatch.setattr(leaderboard_client, 'RECONNECT_DELAY', 0.05)
+    port = free_port()
+    offline = connect(port)
+    offline.save_new_score('Alice', 42)
+    start = time.monotonic()
+    assert not offline.flush(timeout=0.5)
+    assert time.monotonic() - start >= 0.5
+    with open(connect.spool_file) as f:
+        assert [result['name'] for result in json.load(f)] == ['Alice']
+
+    # Next run: the spooled result is sent first, then the spool goes away
+    state = server(RecordingServer(), port)
+    client = connect(port)
+    assert client.flush()
+    assert not os.path.exists(connect.spool_file)
+    assert [(row['player'], row['score']) for row in history(state)] == [('Alice', 42)]
+
+
+class SlowStorageServer(RecordingServer):
+    def _store(self, entries):
+        time.sleep(0.5)
+        return super()._store(entries)
+
+
+def test_storage_does_not_block_the_loop(server, connect):
+    state = server(SlowStorageServer())
+    client = connect(state['port'])
+    client.save_new_score('Alice', 42)
+    assert wait_until(lambda: state['instance'].batches)
+
+    start = time.monotonic()
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0), state['loop']).result(5)
+    assert time.monotonic() - start < 0.25
+    assert client.flush()
+
+
+def test_unacknowledged_results_are_sent_again_once(server, connect):
+    state = server(RecordingServer(drop_first_ack=True))
+    client = connect(state['port'])
+    assert wait_until(lambda: client.connected)
+
+    client.save_new_score('Alice', 42, length=5, duration=12.0)
+    client.save_new_score('Bob', 17)
+    # The first batch is stored but its ack is lost: the client reconnects and sends it again
+    assert wait_until(lambda: len(state['instance'].batches) >= 2)
+    assert client.flush()
+
+    rows = history(state)
+    assert sorted((row['player'], row['score']) for row in rows) == [('Alice', 42), ('Bob', 17)]
+    assert wait_until(lambda: client.load_scores('classic') == [{'name': 'Alice', 'score': 42},
+                                                                {'name': 'Bob', 'score': 17}])
@@ -0,0 +1,40 @@
+import pytest
+
+import config
+
+
+def rows(node_path):
+    total = 0
+    for geom_node in node_path.findAllMatches('**/+GeomNode'):
+        for i in range(geom_node.node().getNumGeoms()):
+            total += geom_node.node().getGeom(i).getVertexData().getNumRows()
+    return total
+
+
+def active_level(lod, distance):
+    """Child of the LODNode drawn for a camera `distance` away (in the node's space)."""
+    node = lod.node()
+    for i in range(node.getNumSwitches()):
+        if node.getOut(i) <= distance < node.getIn(i):
+            return i
+    return None
+
+
+def test_head_levels_get_simpler_with_distance(app):
+    from lod import lod_model
+    scale = config.SNAKE_HEAD_SCALE
+    model = lod_model('snhd', scale)
+    if isinstance(model, str):
+        pytest.skip("LOD levels not built (python src/lod.py build)")
+
+    from panda3d.core import LODNode
+    assert isinstance(model.node(), LODNode)
+    lod = model
+    # One camera distance before, between and after the switch distances (world units)
+    edges = (0,) + tuple(config.LOD_DISTANCES)
+    distances = [(a + b) / 2 for a, b in zip(edges, edges[1:])] + [edges[-1] * 2]
+
+    levels = [active_level(lod, distance / scale) for distance in distances]
+    assert levels == list(range(len(config.LOD_DISTANCES) + 1))
+    counts = [rows(lod.getChild(level)) for level in levels]
+    assert all(a > b for a, b in zip(counts, counts[1:])), counts
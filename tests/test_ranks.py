@@ -0,0 +1,65 @@
+import random
+
+from ranks import ScoreRanks
+
+
+def brute_rank(scores, score):
+    return 1 + sum(1 for s in scores if s > score)
+
+
+def test_empty():
+    ranks = ScoreRanks()
+    assert ranks.total == 0
+    assert ranks.rank(10) == 1
+    assert ranks.top_percent(10) == 100.0
+
+
+def test_rank_counts_strictly_better_games():
+    ranks = ScoreRanks({10: 2, 5: 3, 0: 1})
+    assert ranks.total == 6
+    assert ranks.rank(11) == 1
+    assert ranks.rank(10) == 1
+    assert ranks.rank(9) == 3
+    assert ranks.rank(5) == 3
+    assert ranks.rank(-1) == 7
+    assert ranks.count_at(5) == 3
+    assert ranks.top_percent(10) == 100.0 * 1 / 6
+
+
+def test_scores_above_the_table_grow_it():
+    ranks = ScoreRanks()
+    ranks.add(3)
+    ranks.add(1000)
+    ranks.add(70, count=2)
+    assert ranks.size > 1000
+    assert ranks.total == 4
+    assert ranks.count_at(3) == 1 and ranks.count_at(70) == 2 and ranks.count_at(1000) == 1
+    assert ranks.rank(100) == 2
+    assert ranks.rank(5000) == 1
+
+
+def test_negative_and_float_scores():
+    ranks = ScoreRanks()
+    ranks.add(-4)
+    ranks.add(2.7)
+    assert ranks.count_at(0) == 1
+    assert ranks.count_at(2) == 1
+    assert ranks.rank(0) == 2
+
+
+def test_matches_a_sorted_list():
+    rng = random.Random(36)
+    scores = []
+    ranks = ScoreRanks()
+    for _ in range(2000):
+        score = int(rng.expovariate(1 / 40))
+        scores.append(score)
+        ranks.add(score)
+    for score in range(0, max(scores) + 5):
+        assert ranks.rank(score) == brute_rank(scores, score)
+
+    counts = {}
+    for score in scores:
+        counts[score] = counts.get(score, 0) + 1
+    rebuilt = ScoreRanks(counts)
+    assert [rebuilt.rank(s) for s in range(300)] == [ranks.rank(s) for s in range(300)]
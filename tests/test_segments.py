@@ -0,0 +1,92 @@
+import pytest
+
+import segments
+from segments import InstancedSegments, gradient_slot
+
+
+def palette():
+    from ursina import color
+    return [color.Color(i / 4, 0.5, 1 - i / 4, 1) for i in range(5)]
+
+
+def check(segs, body, previous=None):
+    """The buffer holds `body` (and `previous` before the last move), colored along the palette."""
+    assert segs.count == len(body)
+    assert segs.entity.getInstanceCount() == segs.count - segs.first
+    for i, position in enumerate(body):
+        assert segs.placement(i) == pytest.approx((*position, segs.scale))
+    if previous is not None:
+        for i, position in enumerate(previous):
+            assert segs.previous_placement(i) == pytest.approx((*position, segs.scale))
+    visible = segs.count - segs.first
+    for i in range(segs.first, segs.count):
+        c = segs.palette[gradient_slot(i - segs.first, visible, len(segs.palette))]
+        assert segs.color(i) == pytest.approx((c.r, c.g, c.b, c.a))
+
+
+@pytest.fixture
+def segs(app):
+    segs = InstancedSegments('cube')
+    yield segs
+    segs.entity.removeNode()
+
+
+def test_setup_places_every_segment(segs):
+    body = [(0, 0, 0), (0, 0, -1), (0, 0, -2)]
+    segs.setup(0.4, palette(), body, first=1)
+    check(segs, body, previous=body)
+    assert segs.alpha == 1.0
+
+
+def test_move_shifts_the_body_and_keeps_the_previous_placements(segs):
+    body = [(0, 0, 0), (0, 0, -1), (0, 0, -2), (1, 0, -2)]
+    segs.setup(0.4, palette(), body, first=1)
+
+    for head in ((0, 0, 1), (1, 0, 1), (1, 1, 1)):
+        previous = body
+        body = [head] + body[:-1]
+        segs.on_move(head)
+        check(segs, body, previous)
+        assert segs.alpha == 0.0
+
+
+def test_growing_past_capacity_moves_to_a_bigger_buffer(segs):
+    body = [(0, 0, 0), (0, 0, -1), (0, 0, -2)]
+    segs.setup(0.4, palette(), body, first=1)
+    capacity, buffer = segs.capacity, segs.buffer
+
+    z = 0
+    while len(body) <= capacity + 2:
+        z += 1
+        previous = body
+        body = [(0, 0, z)] + body[:-1]
+        segs.on_move(body[0])
+        # The new tail segment starts where the old tail is
+        segs.on_grow(previous[-1])
+        body.append(previous[-1])
+        check(segs, body, previous + [previous[-1]])
+
+    assert segs.capacity > capacity
+    assert segs.buffer is not buffer
+    # The shader reads the new buffer
+    assert segs.entity.getShaderInput('instance_data').getTexture().getXSize() == 3 * segs.capacity
+
+
+def test_reverse_jumps_to_the_reversed_body(segs):
+    body = [(0, 0, 0), (0, 0, -1), (0, 0, -2), (1, 0, -2), (2, 0, -2)]
+    segs.setup(1, palette(), body)
+    segs.on_move((0, 0, 1))
+    body = [(0, 0, 1)] + body[:-1]
+
+    body.reverse()
+    segs.on_reverse(body)
+    check(segs, body, previous=body)
+    assert segs.alpha == 1.0
+
+
+def test_create_segments_falls_back_without_instancing(app, monkeypatch):
+    monkeypatch.setattr(segments, 'instancing_supported', lambda: False)
+    body = [(0, 0, 0), (0, 0, -1)]
+    fallback = segments.create_segments('cube', 0.4, palette(), body)
+    assert isinstance(fallback, segments.EntitySegments)
+    fallback.destroy()
@@ -0,0 +1,113 @@
+"""
+The orientation tables against the turning rules as they were written
+before them: float vectors, normalized after every turn, compared with a
+tolerance.
+"""
+
+import math
+import random
+
+import player
+from player import Snake
+
+SEQUENCES = 6000
+KEYS_PER_SEQUENCE = 30
+
+
+# --- The old float rules ---
+
+def add(a, b): return tuple(x + y for x, y in zip(a, b))
+def neg(a): return tuple(-x for x in a)
+def dot(a, b): return sum(x * y for x, y in zip(a, b))
+def length(a): return math.sqrt(dot(a, a))
+def close(a, b): return all(abs(x - y) < 1e-6 for x, y in zip(a, b))
+
+def cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+def normalized(a):
+    n = length(a)
+    return tuple(x / n for x in a) if n else a
+
+WORLD_UP = (0.0, 1.0, 0.0)
+
+
+def old_free_roam(direction, up, key):
+    right = normalized(cross(up, direction))
+    if key == 'd': direction = right
+    elif key == 'a': direction = neg(right)
+    elif key == 'w': direction, up = up, neg(direction)
+    elif key == 's': direction, up = neg(up), direction
+    elif key == 'e': up = neg(right)
+    elif key == 'q': up = right
+    return direction, up
+
+
+def old_standard(current_dir, current_up, ref, key):
+    world_down = neg(WORLD_UP)
+    is_vertical = abs(dot(current_dir, WORLD_UP)) > 0.99
+    new_direction, new_up = current_dir, current_up
+
+    if key in ('a', 'd'):
+        local_right = normalized(cross(current_up, current_dir))
+        if not is_vertical:
+            new_direction = local_right if key == 'd' else neg(local_right)
+            new_up = WORLD_UP
+        else:
+            if current_dir[1] > 0.1:
+                new_direction = neg(local_right) if key == 'd' else local_right
+            else:
+                new_direction = local_right if key == 'd' else neg(local_right)
+            new_up = WORLD_UP if abs(dot(new_direction, WORLD_UP)) < 0.01 else current_up
+        ref = normalized(new_direction)
+    elif key in ('w', 's'):
+        if not close(current_dir, WORLD_UP) and not close(current_dir, world_down):
+            new_direction = WORLD_UP if key == 'w' else world_down
+            new_up = ref
+
+    if length(new_direction) > 0.01 and not close(new_direction, neg(current_dir)):
+        return normalized(new_direction), normalized(new_up), ref
+    return current_dir, current_up, ref
+
+
+# --- Tables vs old rules ---
+
+def random_sequences(seed):
+    rng = random.Random(seed)
+    for _ in range(SEQUENCES):
+        yield [rng.choice('wasdqe') for _ in range(KEYS_PER_SEQUENCE)]
+
+
+def test_free_roam_table_matches_the_old_rules():
+    for keys in random_sequences(38):
+        snake = Snake()
+        snake.set_strategy('free_roam')
+        direction, up = (0.0, 0.0, 1.0), (0.0, 1.0, 0.0)
+        for key in keys:
+            snake.current_strategy.handle_turn(key)
+            direction, up = old_free_roam(direction, up, key)
+            assert close(snake.direction, direction) and close(snake.up, up), keys
+
+
+def test_standard_table_matches_the_old_rules():
+    for keys in random_sequences(380):
+        snake = Snake()
+        snake.set_strategy('standard')
+        strategy = snake.current_strategy
+        direction, up, ref = (0.0, 0.0, 1.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)
+        for key in keys:
+            strategy.handle_turn(key)
+            direction, up, ref = old_standard(direction, up, ref, key)
+            assert close(snake.direction, direction) and close(snake.up, up), keys
+            assert close(strategy.horizontal_forward_ref, ref), keys
+
+
+def test_tables_keep_integer_axes():
+    turned = list(player.FREE_ROAM_TURNS[i][key] for i, row in enumerate(player.FREE_ROAM_TURNS) for key in row)
+    for by_ref in player.STANDARD_TURNS:
+        for row in by_ref:
+            turned.extend(orientation for orientation, _ in row.values())
+    for index in turned:
+        direction, up = player.orientation.ORIENTATIONS[index]
+        assert direction.dot(up) == 0
+        assert all(isinstance(c, int) for c in direction + up)